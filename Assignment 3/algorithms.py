@@ -0,0 +1,524 @@
+# algorithms.py
+"""
+Maze generation algorithms, registered by name.
+
+Every algorithm has the same signature:
+
+    carve(walls, width, height, rng, progress=None)
+
+walls is a flat array of wall bit flags (row * width + col) with every wall
+present, and the algorithm removes walls to carve a perfect maze into it.
+rng is anything with the random module's API (the random module itself or a
+random.Random instance).
+
+progress, if given, is called as progress(done, total) every so often while
+carving. It can raise (e.g. GenerationCancelled) to stop generation early.
+
+The row algorithms (Eller, Sidewinder, Binary Tree) are written as row
+generators that only keep O(width) state, so they can also be used to stream
+a maze one row at a time.
+"""
+from array import array
+
+from maze import ALL_WALLS, NOT_N, NOT_E, NOT_S, NOT_W
+
+
+# name -> carve(walls, width, height, rng, progress=None)
+ALGORITHMS = {}
+
+# name -> rows(width, height, rng), yields one bytearray of wall flags per row
+ROW_ALGORITHMS = {}
+
+DEFAULT_ALGORITHM = "backtracker"
+
+# Roughly how many cells go by between progress() calls
+PROGRESS_EVERY = 4096
+
+# Masks that clear one wall bit, indexed by direction (N, E, S, W)
+_KEEP = (NOT_N, NOT_E, NOT_S, NOT_W)
+# Same, but for the wall on the other side of the passage
+_KEEP_OPPOSITE = (NOT_S, NOT_W, NOT_N, NOT_E)
+
+# random.choice(range(n)) picks an index exactly the way random.choice(seq)
+# does for a seq of length n, and these ranges are built only once.
+_INDEX_RANGES = (None, range(1), range(2), range(3), range(4))
+
+
+def register_algorithm(name):
+    """
+    Decorator that adds a carve function to the registry.
+    """
+    def decorator(fn):
+        ALGORITHMS[name] = fn
+        return fn
+    return decorator
+
+
+def register_row_algorithm(name):
+    """
+    Decorator for row generators. Registers the generator itself plus a
+    carve function that writes its rows into a full wall array.
+    """
+    def decorator(rows_fn):
+        def carve(walls, width, height, rng, progress=None):
+            total = width * height
+            for r, row in enumerate(rows_fn(width, height, rng)):
+                walls[r * width:(r + 1) * width] = row
+                if progress is not None:
+                    progress((r + 1) * width, total)
+
+        carve.__name__ = f"carve_{name}"
+        carve.__doc__ = rows_fn.__doc__
+        ROW_ALGORITHMS[name] = rows_fn
+        ALGORITHMS[name] = carve
+        return rows_fn
+    return decorator
+
+
+def get_algorithm(name):
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        known = ", ".join(sorted(ALGORITHMS))
+        raise ValueError(f"Unknown maze algorithm {name!r} (known: {known})") from None
+
+
+def get_row_algorithm(name):
+    try:
+        return ROW_ALGORITHMS[name]
+    except KeyError:
+        known = ", ".join(sorted(ROW_ALGORITHMS))
+        raise ValueError(f"Algorithm {name!r} can't stream rows (row algorithms: {known})") from None
+
+
+def algorithm_names():
+    return sorted(ALGORITHMS)
+
+
+@register_algorithm("backtracker")
+def carve_backtracker(walls, width, height, rng, progress=None):
+    """
+    Randomized DFS backtracking on flat cell indices.
+
+    Starts at index 0. Neighbors are checked in N, E, S, W order and picked
+    with rng.choice, so for the same rng state the maze matches the old
+    cell-by-cell version exactly.
+
+    Visited flags and the candidate buffers are allocated up front, the main
+    loop doesn't build any lists. The stack is an array("i") that grows with
+    the DFS, 4 bytes per cell on it instead of a list slot plus an int
+    object.
+    """
+    total = width * height
+    if total == 0:
+        return
+
+    visited = bytearray(total)
+    stack = array("i")
+    push = stack.append
+    pop = stack.pop
+
+    # Candidate neighbors for the current cell and the direction to each
+    cand = [0, 0, 0, 0]
+    cand_dir = [0, 0, 0, 0]
+
+    choice = rng.choice
+    ranges = _INDEX_RANGES
+    keep = _KEEP
+    keep_opposite = _KEEP_OPPOSITE
+    last_col = width - 1
+    last_row_start = total - width
+
+    cur = 0
+    visited[0] = 1
+    visited_count = 1
+
+    while visited_count < total:
+        col = cur % width
+        n = 0
+        if cur >= width and not visited[cur - width]:
+            cand[n] = cur - width
+            cand_dir[n] = 0
+            n += 1
+        if col < last_col and not visited[cur + 1]:
+            cand[n] = cur + 1
+            cand_dir[n] = 1
+            n += 1
+        if cur < last_row_start and not visited[cur + width]:
+            cand[n] = cur + width
+            cand_dir[n] = 2
+            n += 1
+        if col > 0 and not visited[cur - 1]:
+            cand[n] = cur - 1
+            cand_dir[n] = 3
+            n += 1
+
+        if n:
+            # Pick a random unvisited neighbor and carve to it
+            k = choice(ranges[n])
+            nxt = cand[k]
+            d = cand_dir[k]
+            walls[cur] &= keep[d]
+            walls[nxt] &= keep_opposite[d]
+
+            # Push current for backtracking later
+            push(cur)
+
+            cur = nxt
+            visited[cur] = 1
+            visited_count += 1
+
+            if progress is not None and visited_count % PROGRESS_EVERY == 0:
+                progress(visited_count, total)
+        elif stack:
+            # Dead end, backtrack
+            cur = pop()
+        else:
+            # Should not happen in a normal DFS maze, good to have anyway
+            break
+
+
+@register_algorithm("kruskal")
+def carve_kruskal(walls, width, height, rng, progress=None):
+    """
+    Randomized Kruskal: shuffle every interior wall, then knock a wall down
+    whenever the cells on both sides are in different sets (union-find).
+    """
+    total = width * height
+    if total == 0:
+        return
+
+    # Edge encoding: cell * 2 for the wall to the east, cell * 2 + 1 for south
+    edges = []
+    for r in range(height):
+        base = r * width
+        for c in range(width):
+            i = base + c
+            if c < width - 1:
+                edges.append(i * 2)
+            if r < height - 1:
+                edges.append(i * 2 + 1)
+    rng.shuffle(edges)
+
+    parent = list(range(total))
+    joined = 0
+
+    for e in edges:
+        a = e >> 1
+        b = a + width if e & 1 else a + 1
+
+        # Find roots with path halving
+        ra = a
+        while parent[ra] != ra:
+            parent[ra] = parent[parent[ra]]
+            ra = parent[ra]
+        rb = b
+        while parent[rb] != rb:
+            parent[rb] = parent[parent[rb]]
+            rb = parent[rb]
+        if ra == rb:
+            continue
+
+        parent[rb] = ra
+        if e & 1:
+            walls[a] &= NOT_S
+            walls[b] &= NOT_N
+        else:
+            walls[a] &= NOT_E
+            walls[b] &= NOT_W
+
+        joined += 1
+        if progress is not None and joined % PROGRESS_EVERY == 0:
+            progress(joined, total)
+        if joined == total - 1:
+            break
+
+
+@register_algorithm("prim")
+def carve_prim(walls, width, height, rng, progress=None):
+    """
+    Randomized Prim: grow the maze from one cell by repeatedly taking a random
+    frontier cell and connecting it to a random neighbor already in the maze.
+    """
+    total = width * height
+    if total == 0:
+        return
+
+    # 0 = not reached yet, 1 = on the frontier, 2 = in the maze
+    state = bytearray(total)
+    frontier = []
+    cand = [0, 0, 0, 0]
+    cand_dir = [0, 0, 0, 0]
+    last_col = width - 1
+    last_row_start = total - width
+    randrange = rng.randrange
+
+    def add(i):
+        state[i] = 2
+        col = i % width
+        if i >= width and not state[i - width]:
+            state[i - width] = 1
+            frontier.append(i - width)
+        if col < last_col and not state[i + 1]:
+            state[i + 1] = 1
+            frontier.append(i + 1)
+        if i < last_row_start and not state[i + width]:
+            state[i + width] = 1
+            frontier.append(i + width)
+        if col > 0 and not state[i - 1]:
+            state[i - 1] = 1
+            frontier.append(i - 1)
+
+    add(randrange(total))
+    added = 1
+
+    while frontier:
+        # Swap-remove a random frontier cell
+        k = randrange(len(frontier))
+        cur = frontier[k]
+        frontier[k] = frontier[-1]
+        frontier.pop()
+
+        # Neighbors that are already part of the maze
+        col = cur % width
+        n = 0
+        if cur >= width and state[cur - width] == 2:
+            cand[n] = cur - width
+            cand_dir[n] = 0
+            n += 1
+        if col < last_col and state[cur + 1] == 2:
+            cand[n] = cur + 1
+            cand_dir[n] = 1
+            n += 1
+        if cur < last_row_start and state[cur + width] == 2:
+            cand[n] = cur + width
+            cand_dir[n] = 2
+            n += 1
+        if col > 0 and state[cur - 1] == 2:
+            cand[n] = cur - 1
+            cand_dir[n] = 3
+            n += 1
+
+        k = randrange(n)
+        d = cand_dir[k]
+        walls[cur] &= _KEEP[d]
+        walls[cand[k]] &= _KEEP_OPPOSITE[d]
+        add(cur)
+
+        added += 1
+        if progress is not None and added % PROGRESS_EVERY == 0:
+            progress(added, total)
+
+
+@register_algorithm("wilson")
+def carve_wilson(walls, width, height, rng, progress=None):
+    """
+    Wilson's algorithm: loop-erased random walks from each cell outside the
+    maze until the walk hits the maze, then carve the walk. Gives a uniformly
+    random spanning tree, but the first walks can take a while on big grids.
+    """
+    total = width * height
+    if total == 0:
+        return
+
+    in_maze = bytearray(total)
+    # Direction the walk last left each cell by (loop erasure for free)
+    walk_dir = bytearray(total)
+    offsets = (-width, 1, width, -1)
+    cand_dir = [0, 0, 0, 0]
+    last_col = width - 1
+    last_row_start = total - width
+    randrange = rng.randrange
+
+    in_maze[randrange(total)] = 1
+    done = 1
+    next_report = PROGRESS_EVERY
+
+    for start in range(total):
+        if in_maze[start]:
+            continue
+
+        # Random walk until we hit the maze
+        cur = start
+        while not in_maze[cur]:
+            col = cur % width
+            n = 0
+            if cur >= width:
+                cand_dir[n] = 0
+                n += 1
+            if col < last_col:
+                cand_dir[n] = 1
+                n += 1
+            if cur < last_row_start:
+                cand_dir[n] = 2
+                n += 1
+            if col > 0:
+                cand_dir[n] = 3
+                n += 1
+            d = cand_dir[randrange(n)]
+            walk_dir[cur] = d
+            cur += offsets[d]
+
+        # Carve the loop-erased walk into the maze
+        cur = start
+        while not in_maze[cur]:
+            d = walk_dir[cur]
+            nxt = cur + offsets[d]
+            walls[cur] &= _KEEP[d]
+            walls[nxt] &= _KEEP_OPPOSITE[d]
+            in_maze[cur] = 1
+            cur = nxt
+            done += 1
+
+        if progress is not None and done >= next_report:
+            progress(done, total)
+            next_report = done + PROGRESS_EVERY
+
+
+@register_row_algorithm("eller")
+def eller_rows(width, height, rng):
+    """
+    Eller's algorithm, one row at a time. Only the set labels of the current
+    row are kept, so memory is O(width) no matter how tall the maze is.
+    """
+    rand = rng.random
+    randrange = rng.randrange
+
+    # Set label per column, and label -> columns in that set
+    sets = list(range(width))
+    members = {c: [c] for c in range(width)}
+    next_label = width
+
+    # Columns with a passage down from the row above
+    north_open = bytearray(width)
+
+    for r in range(height):
+        last = r == height - 1
+
+        row = bytearray([ALL_WALLS]) * width
+        for c in range(width):
+            if north_open[c]:
+                row[c] &= NOT_N
+
+        # Randomly join neighbors in different sets (always on the last row)
+        for c in range(width - 1):
+            a = sets[c]
+            b = sets[c + 1]
+            if a == b or not (last or rand() < 0.5):
+                continue
+
+            row[c] &= NOT_E
+            row[c + 1] &= NOT_W
+
+            # Merge the smaller set into the bigger one
+            cols_a = members[a]
+            cols_b = members[b]
+            if len(cols_a) < len(cols_b):
+                a, b = b, a
+                cols_a, cols_b = cols_b, cols_a
+            for col in cols_b:
+                sets[col] = a
+            cols_a.extend(cols_b)
+            del members[b]
+
+        if last:
+            yield row
+            break
+
+        # Every set carves at least one passage down
+        north_open = bytearray(width)
+        for cols in members.values():
+            down = False
+            for col in cols:
+                if rand() < 0.5:
+                    north_open[col] = 1
+                    down = True
+            if not down:
+                north_open[cols[randrange(len(cols))]] = 1
+
+        for c in range(width):
+            if north_open[c]:
+                row[c] &= NOT_S
+
+        # Cells without a passage from above start in a set of their own
+        members = {}
+        for c in range(width):
+            if not north_open[c]:
+                sets[c] = next_label
+                next_label += 1
+            label = sets[c]
+            if label in members:
+                members[label].append(c)
+            else:
+                members[label] = [c]
+
+        yield row
+
+
+@register_row_algorithm("sidewinder")
+def sidewinder_rows(width, height, rng):
+    """
+    Sidewinder, one row at a time. Each row is cut into runs of east passages
+    and every run opens one passage down. The last row is a single corridor.
+    """
+    rand = rng.random
+    randrange = rng.randrange
+    north_open = bytearray(width)
+
+    for r in range(height):
+        row = bytearray([ALL_WALLS]) * width
+        for c in range(width):
+            if north_open[c]:
+                row[c] &= NOT_N
+
+        if r == height - 1:
+            for c in range(width - 1):
+                row[c] &= NOT_E
+                row[c + 1] &= NOT_W
+            yield row
+            break
+
+        north_open = bytearray(width)
+        run_start = 0
+        for c in range(width):
+            if c < width - 1 and rand() < 0.5:
+                row[c] &= NOT_E
+                row[c + 1] &= NOT_W
+            else:
+                down = randrange(run_start, c + 1)
+                row[down] &= NOT_S
+                north_open[down] = 1
+                run_start = c + 1
+
+        yield row
+
+
+@register_row_algorithm("binary_tree")
+def binary_tree_rows(width, height, rng):
+    """
+    Binary Tree, one row at a time. Every cell opens a passage either east or
+    south (only east on the last row, only south on the last column).
+    """
+    rand = rng.random
+    north_open = bytearray(width)
+
+    for r in range(height):
+        last_row = r == height - 1
+        row = bytearray([ALL_WALLS]) * width
+        for c in range(width):
+            if north_open[c]:
+                row[c] &= NOT_N
+
+        north_open = bytearray(width)
+        for c in range(width):
+            last_col = c == width - 1
+            if last_row and last_col:
+                continue
+            if last_col or (not last_row and rand() < 0.5):
+                row[c] &= NOT_S
+                north_open[c] = 1
+            else:
+                row[c] &= NOT_E
+                row[c + 1] &= NOT_W
+
+        yield row
@@ -0,0 +1,274 @@
+# analytics.py
+"""
+Maze metrics for grading difficulty, computed with NumPy over the wall array
+instead of looping over cells.
+
+    solution_length    cells on the start to finish path
+    dead_ends          cells with one open side
+    junctions          cells with three or four open sides
+    branching          average ways on from a junction (open sides - 1)
+    corridors          runs of connected cells with exactly two open sides,
+                       with their mean and longest length in cells and
+                       corridor_lengths, a histogram (index = length)
+    turns              changes of direction along the solution
+    decisions          solution cells with more than one way on
+    difficulty         wrong turns on offer along the solution: every open
+                       side of a solution cell that isn't the way in or the
+                       way on
+
+analyze(maze) returns them as a dict. score_batch() generates and analyzes
+every (size, seed) pair across a process pool, and filter_scores() keeps the
+ones whose metrics fall in given ranges.
+
+Usage: python analytics.py --size 50 50 --seed 0 999 --difficulty 80 120
+(prints the hardest of the mazes kept, by difficulty)
+
+Needs NumPy.
+"""
+import argparse
+import json
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from algorithms import DEFAULT_ALGORITHM, algorithm_names
+from batch import add_task_args, check_task_args, count_dead_ends, make_tasks, task_ranges
+from generator import MazeGenerator, RNG_PYTHON, RNG_NUMPY
+from maze import ALL_WALLS, WALL_E, WALL_S
+from solver import bfs_parents, path_to_root
+
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Hardest kept mazes the command line lists
+SHOW_HARDEST = 20
+
+# Open sides of each wall byte (the visited bit and anything else ignored)
+_OPEN_SIDES = np.array([4 - bin(w & ALL_WALLS).count("1") for w in range(256)], dtype=np.uint8)
+
+
+def label_components(n, u, v):
+    """
+    Connected components of the graph on n nodes with edges u[k] - v[k].
+    Returns each node's label, the smallest node in its component.
+
+    Every round hooks the bigger label of each edge whose ends disagree to
+    the smaller one, then follows labels to their roots (pointer jumping),
+    so the number of rounds grows with the log of the longest path rather
+    than its length.
+    """
+    labels = np.arange(n, dtype=np.int64)
+    while True:
+        lu = labels[u]
+        lv = labels[v]
+        differ = lu != lv
+        if not differ.any():
+            return labels
+        lu = lu[differ]
+        lv = lv[differ]
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def corridor_lengths(walls, size, open_sides=None):
+    """
+    Length in cells of every corridor (run of two-sided cells joined by
+    passages), as an array.
+    """
+    if open_sides is None:
+        open_sides = _OPEN_SIDES[walls]
+    corridor = open_sides == 2
+    cells = np.flatnonzero(corridor)
+    if not cells.size:
+        return np.zeros(0, dtype=np.int64)
+
+    # Passages between two corridor cells, going east and going south. The
+    # last column never has an east passage, so i + 1 stays in the row.
+    n = size * size
+    next_e = np.zeros(n, dtype=bool)
+    next_e[:-1] = corridor[1:]
+    east = np.flatnonzero(corridor & next_e & ((walls & WALL_E) == 0))
+    next_s = np.zeros(n, dtype=bool)
+    next_s[:-size] = corridor[size:]
+    south = np.flatnonzero(corridor & next_s & ((walls & WALL_S) == 0))
+
+    u = np.concatenate((east, south))
+    v = np.concatenate((east + 1, south + size))
+    labels = label_components(n, u, v)
+    counts = np.bincount(labels[cells])
+    return counts[counts > 0]
+
+
+def analyze(maze, solution=None):
+    """
+    All the metrics above for one maze, as a dict of plain ints and floats.
+    solution can be passed as flat cell indices from start to finish,
+    otherwise it's solved here.
+    """
+    size = maze.size
+    walls = np.frombuffer(maze.wall_bytes(), dtype=np.uint8)
+    open_sides = _OPEN_SIDES[walls]
+
+    if solution is None:
+        start = maze.index_of(maze.start_cell)
+        finish = maze.index_of(maze.finish_cell)
+        solution = path_to_root(bfs_parents(maze, finish, target=start), start)
+    path = np.asarray(solution, dtype=np.int64)
+
+    junction = open_sides >= 3
+    junctions = int(np.count_nonzero(junction))
+    branching = float(open_sides[junction].mean()) - 1 if junctions else 0.0
+
+    lengths = corridor_lengths(walls, size, open_sides)
+    hist = np.bincount(lengths) if lengths.size else np.zeros(1, dtype=np.int64)
+
+    turns = 0
+    decisions = 0
+    difficulty = 0
+    if path.size > 1:
+        steps = np.diff(path)
+        turns = int(np.count_nonzero(steps[1:] != steps[:-1]))
+
+        # The start has no way in, the finish no way on
+        sides = open_sides[path[:-1]].astype(np.int64)
+        sides[1:] -= 1
+        decisions = int(np.count_nonzero(sides > 1))
+        difficulty = int((sides - 1).sum())
+
+    return {
+        "size": size,
+        "solution_length": int(path.size),
+        "dead_ends": count_dead_ends(maze),
+        "junctions": junctions,
+        "branching": branching,
+        "corridors": int(lengths.size),
+        "corridor_mean": float(lengths.mean()) if lengths.size else 0.0,
+        "corridor_max": int(lengths.max()) if lengths.size else 0,
+        "corridor_lengths": hist.tolist(),
+        "turns": turns,
+        "decisions": decisions,
+        "difficulty": difficulty,
+    }
+
+
+def _score_chunk(spec):
+    """
+    Generates and analyzes one chunk of (size, seed) pairs. Runs in a worker
+    process, so it only takes and returns plain data.
+    """
+    tasks, algorithm, rng_backend = spec
+    out = []
+    for size, seed in tasks:
+        generator = MazeGenerator(random_seed=seed, algorithm=algorithm, rng_backend=rng_backend)
+        metrics = analyze(generator.generate(size))
+        metrics["seed"] = seed
+        out.append(metrics)
+    return out
+
+
+def score_batch(sizes, seeds, algorithm=DEFAULT_ALGORITHM, rng_backend=RNG_PYTHON,
+                processes=None, chunk_size=DEFAULT_CHUNK_SIZE, report=None):
+    """
+    analyze() every (size, seed) pair, each maze generated the same way
+    batch.py does, across a process pool (processes=1 stays in this
+    process). report(done, total) is called as chunks finish. Returns the
+    metric dicts (with "seed" added) sorted by size, then seed.
+    """
+    tasks = make_tasks(sizes, seeds)
+    specs = [(tasks[i:i + chunk_size], algorithm, rng_backend) for i in range(0, len(tasks), chunk_size)]
+
+    scores = []
+
+    def collect(chunks):
+        for done, chunk in enumerate(chunks, 1):
+            scores.extend(chunk)
+            if report is not None:
+                report(done, len(specs))
+
+    if processes == 1:
+        collect(map(_score_chunk, specs))
+    else:
+        with Pool(processes) as pool:
+            # Chunks finish in any order, sorted below
+            collect(pool.imap_unordered(_score_chunk, specs))
+
+    scores.sort(key=lambda s: (s["size"], s["seed"]))
+    return scores
+
+
+def filter_scores(scores, **ranges):
+    """
+    The scores whose metrics fall in the given inclusive (low, high)
+    ranges, None for no bound, e.g.
+    filter_scores(scores, difficulty=(40, 60), solution_length=(None, 500)).
+    """
+    out = []
+    for s in scores:
+        for name, (low, high) in ranges.items():
+            value = s[name]
+            if (low is not None and value < low) or (high is not None and value > high):
+                break
+        else:
+            out.append(s)
+    return out
+
+
+# Metrics the command line can filter on
+FILTER_METRICS = ("solution_length", "dead_ends", "junctions", "corridor_max", "turns", "decisions", "difficulty")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Score generated mazes by difficulty.")
+    add_task_args(parser, "score")
+    parser.add_argument("--algorithm", default=DEFAULT_ALGORITHM, choices=algorithm_names())
+    parser.add_argument("--rng-backend", default=RNG_PYTHON, choices=(RNG_PYTHON, RNG_NUMPY))
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    for name in FILTER_METRICS:
+        parser.add_argument("--" + name.replace("_", "-"), type=float, nargs=2, metavar=("MIN", "MAX"),
+                            help=f"only keep mazes with {name} in this range")
+    parser.add_argument("--out", help="write the kept mazes' metrics to this JSON file")
+
+    args = parser.parse_args(argv)
+    check_task_args(parser, args)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    sizes, seeds = task_ranges(args)
+    ranges = {name: tuple(getattr(args, name)) for name in FILTER_METRICS if getattr(args, name) is not None}
+
+    def report(done, total):
+        print(f"\rchunks {done}/{total}", end="", flush=True)
+
+    t0 = time.perf_counter()
+    scores = score_batch(sizes, seeds, algorithm=args.algorithm, rng_backend=args.rng_backend,
+                         processes=args.processes, report=report)
+    elapsed = time.perf_counter() - t0
+    kept = filter_scores(scores, **ranges)
+
+    print()
+    print(f"{len(scores)} mazes scored in {elapsed:.2f}s ({len(scores) / elapsed:.0f} mazes/s), {len(kept)} kept")
+    hardest = sorted(kept, key=lambda s: s["difficulty"], reverse=True)
+    for s in hardest[:SHOW_HARDEST]:
+        print(f"  size {s['size']:>5} seed {s['seed']:>8}  difficulty {s['difficulty']:>6}  "
+              f"solution {s['solution_length']:>6}  dead ends {s['dead_ends']:>6}  turns {s['turns']:>5}")
+    if len(kept) > SHOW_HARDEST:
+        print(f"  ... {len(kept) - SHOW_HARDEST} more")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(kept, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
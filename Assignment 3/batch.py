@@ -0,0 +1,216 @@
+# batch.py
+"""
+Offline batch generation: lots of mazes across a process pool, written into
+sharded maze files, without starting the game.
+
+Every size in the size range is paired with every seed in the seed range.
+The work is split into shards of at most --shard-size mazes, and into enough
+of them that every worker process stays busy to the end. Each shard gets an
+even mix of the sizes, so the big mazes don't all land in the last shards.
+A shard is built by one worker process and written as
+
+    shard-NNNNN.mzs   the mazes, one mazefile record after another
+    shard-NNNNN.json  manifest: seed, size, solution length, dead ends and
+                      the record's offset in the .mzs file
+
+Load a record back with mazefile.load(path, offset=entry["offset"]).
+
+Usage: python batch.py --size 10 50 --seed 0 999 --out packs
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import mazefile
+from algorithms import DEFAULT_ALGORITHM, algorithm_names
+from generator import MazeGenerator, RNG_PYTHON, RNG_NUMPY
+from maze import ALL_WALLS
+from solver import solve_path
+
+
+DEFAULT_SHARD_SIZE = 256
+
+# Shards per worker process, when there are enough mazes. More than one so
+# processes that finish early pick up more work instead of sitting idle.
+SHARDS_PER_PROCESS = 4
+
+# bytes.translate() table: 1 for a cell with exactly three walls (a dead
+# end), 0 otherwise, so counting dead ends is translate + count
+_DEAD_END = bytes(
+    1 if bin(b & ALL_WALLS).count("1") == 3 else 0 for b in range(256)
+)
+
+
+def count_dead_ends(maze):
+    return bytes(maze.wall_bytes()).translate(_DEAD_END).count(1)
+
+
+def make_tasks(sizes, seeds):
+    return [(size, seed) for size in sizes for seed in seeds]
+
+
+def add_task_args(parser, verb="generate"):
+    """
+    The --size, --size-step and --seed arguments (also used by analytics.py).
+    """
+    parser.add_argument("--size", type=int, nargs=2, metavar=("MIN", "MAX"), required=True,
+                        help=f"maze sizes to {verb}, inclusive")
+    parser.add_argument("--size-step", type=int, default=1)
+    parser.add_argument("--seed", type=int, nargs=2, metavar=("FIRST", "LAST"), required=True,
+                        help=f"seeds to {verb} for each size, inclusive")
+
+
+def check_task_args(parser, args):
+    if args.size[0] < 2 or args.size[0] > args.size[1]:
+        parser.error("--size needs 2 <= MIN <= MAX")
+    if args.seed[0] > args.seed[1]:
+        parser.error("--seed needs FIRST <= LAST")
+    if args.size_step < 1:
+        parser.error("--size-step must be at least 1")
+
+
+def task_ranges(args):
+    """
+    (sizes, seeds) from the add_task_args() arguments.
+    """
+    sizes = range(args.size[0], args.size[1] + 1, args.size_step)
+    seeds = range(args.seed[0], args.seed[1] + 1)
+    return sizes, seeds
+
+
+def make_shards(tasks, shard_size, processes=1):
+    """
+    Split tasks into shards of at most shard_size, and at least
+    SHARDS_PER_PROCESS per process if there are enough tasks. Shard k takes
+    every n-th task starting at k, which spreads every size evenly across
+    the shards (tasks come grouped by size).
+    """
+    if not tasks:
+        return []
+    count = max(-(-len(tasks) // shard_size), min(len(tasks), processes * SHARDS_PER_PROCESS))
+    return [tasks[k::count] for k in range(count)]
+
+
+def _write_shard(spec):
+    """
+    Builds one shard. Runs in a worker process, so it only takes and returns
+    plain data. Returns (shard number, mazes written, bytes written).
+    """
+    number, tasks, out_dir, algorithm, rng_backend, packed, with_solution = spec
+
+    name = f"shard-{number:05d}"
+    data_path = os.path.join(out_dir, name + ".mzs")
+    entries = []
+
+    with open(data_path, "wb") as f:
+        for size, seed in tasks:
+            generator = MazeGenerator(random_seed=seed, algorithm=algorithm, rng_backend=rng_backend)
+            maze = generator.generate(size)
+            path = solve_path(maze, maze.start_cell, maze.finish_cell)
+
+            offset = f.tell()
+            length = mazefile.write_record(f, maze, path if with_solution else None, packed)
+            entries.append({
+                "seed": seed,
+                "size": size,
+                "solution_length": len(path),
+                "dead_ends": count_dead_ends(maze),
+                "offset": offset,
+                "length": length,
+            })
+        total_bytes = f.tell()
+
+    manifest = {
+        "file": name + ".mzs",
+        "algorithm": algorithm,
+        "rng_backend": rng_backend,
+        "packed": packed,
+        "solution": with_solution,
+        "mazes": entries,
+    }
+    with open(os.path.join(out_dir, name + ".json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    return number, len(entries), total_bytes
+
+
+def run(sizes, seeds, out_dir, algorithm=DEFAULT_ALGORITHM, rng_backend=RNG_PYTHON,
+        processes=None, shard_size=DEFAULT_SHARD_SIZE, packed=True, with_solution=True,
+        report=None):
+    """
+    Generate every (size, seed) pair into shards under out_dir.
+    report(shards done, shard count) is called as shards finish.
+    Returns (mazes written, bytes written).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    shards = make_shards(make_tasks(sizes, seeds), shard_size, processes or os.cpu_count() or 1)
+    specs = [
+        (number, tasks, out_dir, algorithm, rng_backend, packed, with_solution)
+        for number, tasks in enumerate(shards)
+    ]
+
+    mazes = 0
+    written = 0
+    with Pool(processes) as pool:
+        # Shards finish in any order, each one is written by its own process
+        for done, (_, count, nbytes) in enumerate(pool.imap_unordered(_write_shard, specs), 1):
+            mazes += count
+            written += nbytes
+            if report is not None:
+                report(done, len(specs))
+    return mazes, written
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate mazes in bulk into sharded maze files.")
+    add_task_args(parser)
+    parser.add_argument("--algorithm", default=DEFAULT_ALGORITHM, choices=algorithm_names())
+    parser.add_argument("--rng-backend", default=RNG_PYTHON, choices=(RNG_PYTHON, RNG_NUMPY))
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help="most mazes per shard file")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--unpacked", action="store_true",
+                        help="one byte per cell instead of two cells per byte")
+    parser.add_argument("--no-solution", action="store_true",
+                        help="don't store solutions (the manifest still has their length)")
+
+    args = parser.parse_args(argv)
+    check_task_args(parser, args)
+    if args.shard_size < 1:
+        parser.error("--shard-size must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    sizes, seeds = task_ranges(args)
+
+    def report(done, total):
+        print(f"\rshards {done}/{total}", end="", flush=True)
+
+    t0 = time.perf_counter()
+    mazes, written = run(
+        sizes, seeds, args.out,
+        algorithm=args.algorithm,
+        rng_backend=args.rng_backend,
+        processes=args.processes,
+        shard_size=args.shard_size,
+        packed=not args.unpacked,
+        with_solution=not args.no_solution,
+        report=report,
+    )
+    elapsed = time.perf_counter() - t0
+
+    print()
+    print(f"{mazes} mazes, {written / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({mazes / elapsed:.0f} mazes/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
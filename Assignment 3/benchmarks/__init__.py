@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+"""
+Benchmarks for the maze game. Run them from the "Assignment 3" folder.
+
+The full suite (results to JSON, regression check against a baseline):
+    python -m benchmarks run --out results.json
+    python -m benchmarks compare baseline.json results.json
+
+Single-topic comparisons, e.g. "python -m benchmarks.bench_storage"
+"""
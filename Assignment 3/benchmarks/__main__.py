@@ -0,0 +1,7 @@
+# benchmarks/__main__.py
+import sys
+
+from benchmarks.suite import main
+
+
+sys.exit(main())
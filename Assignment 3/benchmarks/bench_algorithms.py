@@ -0,0 +1,94 @@
+# benchmarks/bench_algorithms.py
+"""
+Time and peak memory for every registered generation algorithm across maze
+sizes. Each maze is also checked to be perfect (n - 1 passages, every cell
+reachable) and solvable with build_solution_path.
+
+Usage: python -m benchmarks.bench_algorithms [size ...]
+"""
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+from algorithms import algorithm_names
+from generator import MazeGenerator
+from main import build_solution_path
+from maze import WALL_E, WALL_S, WALL_N, WALL_W
+
+
+DEFAULT_SIZES = (50, 200, 500)
+
+SEED = 1234
+
+
+def is_perfect(maze):
+    """
+    A maze is perfect when it's a spanning tree: n - 1 passages and
+    everything reachable from the start.
+    """
+    size = maze.size
+    walls = maze.walls
+    total = size * size
+
+    passages = 0
+    for i in range(total):
+        w = walls[i]
+        if not w & WALL_E:
+            passages += 1
+        if not w & WALL_S:
+            passages += 1
+    if passages != total - 1:
+        return False
+
+    seen = bytearray(total)
+    seen[0] = 1
+    q = deque([0])
+    reached = 1
+    while q:
+        i = q.popleft()
+        w = walls[i]
+        for bit, off in ((WALL_N, -size), (WALL_E, 1), (WALL_S, size), (WALL_W, -1)):
+            if not w & bit and not seen[i + off]:
+                seen[i + off] = 1
+                reached += 1
+                q.append(i + off)
+    return reached == total
+
+
+def run_one(name, size):
+    generator = MazeGenerator(random_seed=SEED, algorithm=name)
+
+    t0 = time.perf_counter()
+    maze = generator.generate(size)
+    elapsed = time.perf_counter() - t0
+
+    ok = is_perfect(maze) and bool(build_solution_path(maze, maze.start_cell, maze.finish_cell))
+    del maze
+
+    tracemalloc.start()
+    maze = generator.generate(size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The maze itself is the same for every algorithm, report the extra
+    extra = max(0, peak - len(maze.walls))
+    return elapsed, extra, ok
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    print(f"{'algorithm':<12} {'size':>6} {'time s':>9} {'cells/s':>12} {'extra peak KB':>14} {'perfect':>8}")
+    for name in algorithm_names():
+        for size in sizes:
+            elapsed, extra, ok = run_one(name, size)
+            print(
+                f"{name:<12} {size:>6} {elapsed:>9.3f} {size * size / elapsed:>12,.0f} "
+                f"{extra / 1024:>14,.1f} {'yes' if ok else 'NO':>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_analytics.py
+"""
+Compares analytics.analyze (NumPy over the wall array) with the same metrics
+computed the old way, looping over maze.cells with get_neighbors. Both must
+give the same numbers.
+
+Usage: python -m benchmarks.bench_analytics [size ...]
+"""
+import sys
+import time
+
+from analytics import analyze
+from generator import MazeGenerator
+from main import build_solution_path
+
+
+DEFAULT_SIZES = (50, 100, 500, 1000)
+
+SEED = 1234
+
+
+def reference_analyze(maze):
+    """
+    The loop version: neighbors per cell, corridors walked one at a time.
+    """
+    open_count = {}
+    for row in maze.cells:
+        for cell in row:
+            open_count[cell] = len(maze.get_neighbors(cell))
+
+    dead_ends = sum(1 for n in open_count.values() if n == 1)
+    junction_sides = [n for n in open_count.values() if n >= 3]
+    branching = sum(junction_sides) / len(junction_sides) - 1 if junction_sides else 0.0
+
+    # Flood fill each run of two-sided cells
+    lengths = []
+    seen = set()
+    for cell, n in open_count.items():
+        if n != 2 or cell in seen:
+            continue
+        seen.add(cell)
+        stack = [cell]
+        length = 0
+        while stack:
+            cur = stack.pop()
+            length += 1
+            for nxt in maze.get_neighbors(cur):
+                if open_count[nxt] == 2 and nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        lengths.append(length)
+
+    hist = [0] * (max(lengths) + 1 if lengths else 1)
+    for length in lengths:
+        hist[length] += 1
+
+    path = build_solution_path(maze, maze.start_cell, maze.finish_cell)
+    turns = 0
+    decisions = 0
+    difficulty = 0
+    for k in range(len(path) - 1):
+        if k > 0:
+            before = (path[k].row - path[k - 1].row, path[k].col - path[k - 1].col)
+            after = (path[k + 1].row - path[k].row, path[k + 1].col - path[k].col)
+            if before != after:
+                turns += 1
+        ways_on = open_count[path[k]] - (1 if k > 0 else 0)
+        if ways_on > 1:
+            decisions += 1
+        difficulty += ways_on - 1
+
+    return {
+        "size": maze.size,
+        "solution_length": len(path),
+        "dead_ends": dead_ends,
+        "junctions": len(junction_sides),
+        "branching": branching,
+        "corridors": len(lengths),
+        "corridor_mean": sum(lengths) / len(lengths) if lengths else 0.0,
+        "corridor_max": max(lengths) if lengths else 0,
+        "corridor_lengths": hist,
+        "turns": turns,
+        "decisions": decisions,
+        "difficulty": difficulty,
+    }
+
+
+def same(a, b):
+    for key, value in a.items():
+        if isinstance(value, float):
+            if abs(value - b[key]) > 1e-9:
+                return False
+        elif value != b[key]:
+            return False
+    return a.keys() == b.keys()
+
+
+def time_call(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    print(f"{'algorithm':<12} {'size':>6} {'old s':>9} {'new s':>9} {'speedup':>8} {'difficulty':>10} {'same':>5}")
+    for algorithm in ("backtracker", "kruskal"):
+        generator = MazeGenerator(random_seed=SEED, algorithm=algorithm)
+        for size in sizes:
+            maze = generator.generate(size)
+
+            old, old_s = time_call(reference_analyze, maze)
+            new, new_s = time_call(analyze, maze)
+
+            print(
+                f"{algorithm:<12} {size:>6} {old_s:>9.3f} {new_s:>9.3f} "
+                f"{old_s / new_s:>7.1f}x {new['difficulty']:>10} {'yes' if same(old, new) else 'NO':>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
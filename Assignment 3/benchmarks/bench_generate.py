@@ -0,0 +1,89 @@
+# benchmarks/bench_generate.py
+"""
+Reports generation throughput (cells per second) for MazeGenerator,
+next to the old cell-by-cell backtracker for the sizes where it's bearable.
+Both are run with the same seed and must carve the same maze.
+
+Usage: python -m benchmarks.bench_generate [size ...]
+"""
+import random
+import sys
+import time
+
+from generator import MazeGenerator
+from maze import Maze
+
+
+DEFAULT_SIZES = (100, 500, 1000, 2000)
+
+# The reference version is slow, skip it above this size
+REFERENCE_MAX_SIZE = 1000
+
+SEED = 1234
+
+
+def reference_generate(size, seed):
+    """
+    The old backtracker: Cell objects, a visited flag per cell and a fresh
+    neighbor list on every step.
+    """
+    random.seed(seed)
+    maze = Maze(size)
+    stack = []
+    current = maze.start_cell
+    current.visited = True
+    total = size * size
+    visited_count = 1
+
+    while visited_count < total:
+        neighbors = []
+        for d in ("N", "E", "S", "W"):
+            nxt = maze.get_adjacent(current, d)
+            if nxt is not None and not nxt.visited:
+                neighbors.append(nxt)
+
+        if neighbors:
+            nxt = random.choice(neighbors)
+            maze.remove_wall_between(current, nxt)
+            stack.append(current)
+            current = nxt
+            current.visited = True
+            visited_count += 1
+        elif stack:
+            current = stack.pop()
+        else:
+            break
+
+    maze.clear_visited()
+    return maze
+
+
+def time_call(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    generator = MazeGenerator(random_seed=SEED)
+
+    print(f"{'size':>6} {'fast s':>9} {'fast cells/s':>14} {'ref s':>9} {'ref cells/s':>14} {'same':>5}")
+    for size in sizes:
+        cells = size * size
+        fast, fast_s = time_call(generator.generate, size)
+
+        if size <= REFERENCE_MAX_SIZE:
+            ref, ref_s = time_call(reference_generate, size, SEED)
+            same = "yes" if fast.walls == ref.walls else "NO"
+            ref_cols = f"{ref_s:>9.3f} {cells / ref_s:>14,.0f} {same:>5}"
+        else:
+            ref_cols = f"{'-':>9} {'-':>14} {'-':>5}"
+
+        print(f"{size:>6} {fast_s:>9.3f} {cells / fast_s:>14,.0f} {ref_cols}")
+
+
+if __name__ == "__main__":
+    main()
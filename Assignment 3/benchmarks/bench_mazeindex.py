@@ -0,0 +1,76 @@
+# benchmarks/bench_mazeindex.py
+"""
+Compares MazeIndex path and distance queries with solving each pair from
+scratch with solve_path. Both must give the same paths, whether the index
+did its own BFS from the start or was built from the worker's BFS parents
+from the finish (as main does).
+
+Usage: python -m benchmarks.bench_mazeindex [size ...]
+"""
+import random
+import sys
+import time
+
+from generator import MazeGenerator
+from mazeindex import MazeIndex
+from solver import solve_path, solve_with_parents
+
+
+DEFAULT_SIZES = (50, 100, 500, 1000)
+
+SEED = 1234
+
+# Random cell pairs queried per maze
+QUERIES = 20
+
+
+def time_call(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    print(
+        f"{'algorithm':<12} {'size':>6} {'build s':>9} {'solve ms':>9} {'index ms':>9} "
+        f"{'speedup':>8} {'same':>5}"
+    )
+    for algorithm in ("backtracker", "kruskal"):
+        generator = MazeGenerator(random_seed=SEED, algorithm=algorithm)
+        for size in sizes:
+            maze = generator.generate(size)
+            rng = random.Random(size)
+            cells = [maze.cell_at(rng.randrange(size * size)) for _ in range(2 * QUERIES)]
+            pairs = list(zip(cells[::2], cells[1::2]))
+
+            index, build_s = time_call(MazeIndex, maze)
+            _, parents = solve_with_parents(maze, maze.start_cell, maze.finish_cell)
+            from_finish = MazeIndex(maze, root=maze.finish_cell, parents=parents)
+
+            same = True
+            solve_s = 0.0
+            index_s = 0.0
+            for a, b in pairs:
+                old, old_s = time_call(solve_path, maze, a, b)
+                new, new_s = time_call(index.path, a, b)
+                solve_s += old_s
+                index_s += new_s
+                if (
+                    new != old
+                    or from_finish.path(a, b) != old
+                    or index.distance(a, b) != len(old) - 1
+                    or (a != b and index.next_step_toward(a, b) != old[1])
+                ):
+                    same = False
+
+            print(
+                f"{algorithm:<12} {size:>6} {build_s:>9.3f} {solve_s / QUERIES * 1000:>9.3f} "
+                f"{index_s / QUERIES * 1000:>9.3f} {solve_s / index_s:>7.1f}x {'yes' if same else 'NO':>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_render.py
+"""
+Frame time of Renderer.render with the cached wall and overlay layers on and off.
+Sizes too big to fit the window use the camera (cached tiles vs. culled drawing).
+Runs headless with SDL's dummy video driver.
+
+Usage: python -m benchmarks.bench_render [size ...]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from generator import MazeGenerator
+from main import WINDOW_W, WINDOW_H, UI_BAR_H, build_solution_path
+from player import Player
+from renderer import Renderer
+from ui import UIControls
+
+
+DEFAULT_SIZES = (10, 50, 100, 1000)
+
+FRAMES = 120
+
+SEED = 1234
+
+
+def time_frames(renderer, screen, maze, player, ui, frames):
+    """
+    Returns average milliseconds per frame. The first frame (which builds
+    any caches) is left out.
+    """
+    renderer.render(screen, maze, player, ui, "PLAYING", [])
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        renderer.render(screen, maze, player, ui, "PLAYING", [])
+    return (time.perf_counter() - t0) * 1000 / frames
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
+    ui = UIControls(window_w=WINDOW_W, ui_bar_h=UI_BAR_H)
+    generator = MazeGenerator(random_seed=SEED)
+
+    print(f"{'size':>6} {'uncached ms':>12} {'cached ms':>10} {'speedup':>8}")
+    for size in sizes:
+        maze = generator.generate(size)
+        player = Player()
+        player.reset(maze.start_cell)
+
+        # Walk the solution so there's a realistic trail to draw
+        for cell in build_solution_path(maze, maze.start_cell, maze.finish_cell)[1:]:
+            player.current_cell = cell
+            player.trail.append(cell)
+
+        slow = time_frames(Renderer(WINDOW_W, WINDOW_H, UI_BAR_H, cache_layers=False), screen, maze, player, ui, FRAMES)
+        fast = time_frames(Renderer(WINDOW_W, WINDOW_H, UI_BAR_H, cache_layers=True), screen, maze, player, ui, FRAMES)
+        print(f"{size:>6} {slow:>12.2f} {fast:>10.2f} {slow / fast:>7.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
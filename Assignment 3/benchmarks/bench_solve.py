@@ -0,0 +1,78 @@
+# benchmarks/bench_solve.py
+"""
+Compares build_solution_path (level-by-level BFS in solver.py) with the old
+BFS over Cell objects and get_neighbors. Both must return the same path.
+
+Usage: python -m benchmarks.bench_solve [size ...]
+"""
+import sys
+import time
+from collections import deque
+
+from generator import MazeGenerator
+from main import build_solution_path
+
+
+DEFAULT_SIZES = (100, 500, 1000, 2000, 4000)
+
+SEED = 1234
+
+
+def reference_solution_path(maze, start_cell, finish_cell):
+    """
+    The old build_solution_path: BFS with a dict keyed on cells.
+    """
+    q = deque()
+    q.append(start_cell)
+    came_from = {start_cell: None}
+
+    while q:
+        cur = q.popleft()
+        if cur == finish_cell:
+            break
+        for nxt in maze.get_neighbors(cur):
+            if nxt not in came_from:
+                came_from[nxt] = cur
+                q.append(nxt)
+
+    if finish_cell not in came_from:
+        return []
+
+    path = []
+    cur = finish_cell
+    while cur is not None:
+        path.append(cur)
+        cur = came_from[cur]
+    path.reverse()
+    return path
+
+
+def time_call(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    print(f"{'algorithm':<12} {'size':>6} {'old s':>9} {'new s':>9} {'speedup':>8} {'path':>8} {'same':>5}")
+    for algorithm in ("backtracker", "kruskal"):
+        generator = MazeGenerator(random_seed=SEED, algorithm=algorithm)
+        for size in sizes:
+            maze = generator.generate(size)
+            args = (maze, maze.start_cell, maze.finish_cell)
+
+            old, old_s = time_call(reference_solution_path, *args)
+            new, new_s = time_call(build_solution_path, *args)
+            same = "yes" if old == new else "NO"
+
+            print(
+                f"{algorithm:<12} {size:>6} {old_s:>9.3f} {new_s:>9.3f} "
+                f"{old_s / new_s:>7.1f}x {len(new):>8} {same:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
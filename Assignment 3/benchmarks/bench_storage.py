@@ -0,0 +1,74 @@
+# benchmarks/bench_storage.py
+"""
+Compares the flat bytearray wall storage in Maze against the old grid of
+per-cell objects (one object per cell, held in a list of lists).
+
+Usage: python -m benchmarks.bench_storage [size ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from maze import Maze
+
+
+DEFAULT_SIZES = (100, 1000, 4000)
+
+
+class LegacyCell:
+    """
+    Copy of the old Cell class, kept here only for comparison.
+    """
+    __slots__ = ("row", "col", "wall_n", "wall_e", "wall_s", "wall_w", "visited")
+
+    def __init__(self, row, col):
+        self.row = row
+        self.col = col
+        self.wall_n = True
+        self.wall_e = True
+        self.wall_s = True
+        self.wall_w = True
+        self.visited = False
+
+
+def build_legacy_grid(size):
+    return [[LegacyCell(r, c) for c in range(size)] for r in range(size)]
+
+
+def build_flat_maze(size):
+    return Maze(size)
+
+
+def measure(build, size):
+    """
+    Returns (build_seconds, peak_bytes).
+    Timing and memory are measured in separate runs since tracemalloc
+    slows allocation down a lot.
+    """
+    t0 = time.perf_counter()
+    obj = build(size)
+    elapsed = time.perf_counter() - t0
+    del obj
+
+    tracemalloc.start()
+    obj = build(size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+
+    return elapsed, peak
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] if argv else list(DEFAULT_SIZES)
+
+    print(f"{'size':>6} {'storage':>8} {'build s':>10} {'peak MB':>10}")
+    for size in sizes:
+        for name, build in (("cells", build_legacy_grid), ("flat", build_flat_maze)):
+            elapsed, peak = measure(build, size)
+            print(f"{size:>6} {name:>8} {elapsed:>10.4f} {peak / (1024 * 1024):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# benchmarks/suite.py
+"""
+Headless benchmark suite: generation, solving, a scripted random walk through
+Player and N frames of Renderer.render, over a matrix of maze sizes and seeds.
+
+    python -m benchmarks run --out results.json
+    python -m benchmarks run --sizes 10 50 100 --seeds 1 2 3 --frames 120
+    python -m benchmarks compare baseline.json results.json --threshold 0.15
+
+Every case is timed --repeat times and the fastest run is kept. Peak memory
+comes from a separate run under tracemalloc, since tracing slows things down.
+compare exits with status 1 if any case got slower than the threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from generator import MazeGenerator
+from main import WINDOW_W, WINDOW_H, UI_BAR_H, build_solution_path
+from player import Player
+from renderer import Renderer
+from ui import UIControls
+
+
+DEFAULT_SIZES = (10, 50, 100)
+DEFAULT_SEEDS = (1, 2, 3)
+DEFAULT_FRAMES = 60
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+
+# Random walk length, in moves per cell of maze width
+WALK_MOVES_PER_SIZE = 20
+
+
+def _measure(fn, repeat):
+    """
+    Returns (best_seconds, peak_bytes, result of the last call).
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best:
+            best = elapsed
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak, result
+
+
+def _random_walk(maze, seed, moves):
+    player = Player()
+    player.reset(maze.start_cell)
+    rng = random.Random(seed)
+    directions = "NESW"
+    for _ in range(moves):
+        player.try_move(directions[rng.randrange(4)], maze)
+    return player
+
+
+def run_suite(sizes, seeds, frames, repeat, log=print):
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
+    ui = UIControls(window_w=WINDOW_W, ui_bar_h=UI_BAR_H)
+
+    results = []
+
+    def record(bench, size, seed, seconds, peak, **extra):
+        entry = {"bench": bench, "size": size, "seed": seed, "seconds": seconds, "peak_bytes": peak}
+        entry.update(extra)
+        results.append(entry)
+        log(f"{bench:<9} size={size:<5} seed={seed:<4} {seconds * 1000:>10.3f} ms  peak {peak / 1024:>10.1f} KB")
+
+    for size in sizes:
+        for seed in seeds:
+            generator = MazeGenerator(random_seed=seed)
+
+            seconds, peak, maze = _measure(lambda: generator.generate(size), repeat)
+            record("generate", size, seed, seconds, peak)
+
+            seconds, peak, path = _measure(
+                lambda: build_solution_path(maze, maze.start_cell, maze.finish_cell), repeat
+            )
+            record("solve", size, seed, seconds, peak, path_length=len(path))
+
+            moves = size * WALK_MOVES_PER_SIZE
+            seconds, peak, player = _measure(lambda: _random_walk(maze, seed, moves), repeat)
+            record("walk", size, seed, seconds, peak, moves=moves)
+
+            def draw_frames():
+                renderer = Renderer(window_w=WINDOW_W, window_h=WINDOW_H, ui_bar_h=UI_BAR_H)
+                for _ in range(frames):
+                    renderer.render(screen, maze, player, ui, "PLAYING", path)
+
+            seconds, peak, _ = _measure(draw_frames, repeat)
+            record("render", size, seed, seconds, peak, frames=frames)
+
+    pygame.quit()
+    return results
+
+
+def compare(baseline, current, threshold):
+    """
+    Returns a list of (key, old_seconds, new_seconds, ratio, regressed) for
+    every case found in both result sets.
+    """
+    def by_key(data):
+        return {(r["bench"], r["size"], r["seed"]): r for r in data["results"]}
+
+    old = by_key(baseline)
+    new = by_key(current)
+
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        old_s = old[key]["seconds"]
+        new_s = new[key]["seconds"]
+        ratio = new_s / old_s if old_s > 0 else float("inf")
+        rows.append((key, old_s, new_s, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _cmd_run(args):
+    results = run_suite(args.sizes, args.seeds, args.frames, args.repeat)
+    data = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "seeds": args.seeds,
+            "frames": args.frames,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return _report(compare(baseline, data, args.threshold), args.threshold)
+    return 0
+
+
+def _cmd_compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return _report(compare(baseline, current, args.threshold), args.threshold)
+
+
+def _report(rows, threshold):
+    if not rows:
+        print("No cases in common between the two result sets.")
+        return 0
+
+    regressions = 0
+    print(f"{'bench':<9} {'size':>5} {'seed':>5} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for (bench, size, seed), old_s, new_s, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{bench:<9} {size:>5} {seed:>5} {old_s * 1000:>10.3f} {new_s * 1000:>10.3f} {ratio:>6.2f}x{flag}")
+        regressions += regressed
+
+    if regressions:
+        print(f"{regressions} case(s) slower than the {threshold:.0%} threshold.")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Maze game benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the benchmarks")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run.add_argument("--seeds", type=int, nargs="+", default=list(DEFAULT_SEEDS))
+    run.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="frames rendered per case")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per case, the best is kept")
+    run.add_argument("--out", help="write results to this JSON file")
+    run.add_argument("--baseline", help="compare against this saved JSON file when done")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run.set_defaults(func=_cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="compare two saved result files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="allowed slowdown before a case is flagged (0.10 = 10%%)")
+    cmp_.set_defaults(func=_cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,68 +1,135 @@
 # generator.py
 import random
 from maze import Maze
+from algorithms import DEFAULT_ALGORITHM, get_algorithm, get_row_algorithm
 
 
-class MazeGenerator:
+RNG_PYTHON = "python"
+RNG_NUMPY = "numpy"
+
+
+class GenerationCancelled(Exception):
     """
-    Generates a perfect maze using randomized DFS backtracking.
-    Perfect maze = exactly one path between any two cells.
+    Raised from a progress callback to stop a generate() call part way.
     """
-    def __init__(self, random_seed=None):
-        self.random_seed = random_seed
 
-    def generate(self, size):
-        if self.random_seed is not None:
-            random.seed(self.random_seed)
 
-        maze = Maze(size)
+class NumpyRandom:
+    """
+    random.Random-style wrapper around a numpy.random.Generator, with the
+    methods the algorithms use (random, randrange, choice, shuffle).
+
+    Floats are drawn from NumPy in batches and handed out one at a time,
+    which is much cheaper than one NumPy call per draw.
+    """
+    BATCH = 4096
+
+    def __init__(self, seed=None):
+        import numpy as np
+
+        self._gen = np.random.default_rng(seed)
+        self._buf = []
+
+    def random(self):
+        if not self._buf:
+            self._buf = self._gen.random(self.BATCH).tolist()
+        return self._buf.pop()
+
+    def randrange(self, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        return start + int(self.random() * (stop - start))
 
-        # Stack for DFS backtracking
-        stack = []
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
 
-        start = maze.start_cell
-        start.visited = True
-        current = start
+    def shuffle(self, x):
+        self._gen.shuffle(x)
 
-        total = size * size
-        visited_count = 1
 
-        while visited_count < total:
-            neighbors = self._get_unvisited_neighbors(maze, current)
+def make_rng(seed=None, backend=RNG_PYTHON):
+    """
+    A new private RNG. backend is "python" (random.Random) or "numpy".
+    """
+    if backend == RNG_PYTHON:
+        return random.Random(seed)
+    if backend == RNG_NUMPY:
+        return NumpyRandom(seed)
+    raise ValueError(f"Unknown RNG backend {backend!r} (use {RNG_PYTHON!r} or {RNG_NUMPY!r})")
+
+
+class MazeGenerator:
+    """
+    Generates a perfect maze with one of the algorithms in algorithms.py
+    (randomized DFS backtracking by default).
+    Perfect maze = exactly one path between any two cells.
 
-            if neighbors:
-                # Pick a random unvisited neighbor
-                nxt = random.choice(neighbors)
+    Each generator owns its RNG and never touches the global random module,
+    so generators in different threads or processes don't affect each other.
+    With a random_seed, every generate() call starts from a fresh RNG seeded
+    with it, so the same seed always gives the same maze (the python backend
+    gives the same mazes random.seed(random_seed) used to).
+    """
+    def __init__(self, random_seed=None, algorithm=DEFAULT_ALGORITHM, rng_backend=RNG_PYTHON):
+        self.random_seed = random_seed
+        self.rng_backend = rng_backend
 
-                # Carve path
-                maze.remove_wall_between(current, nxt)
+        # Fail early on a typo instead of on the first generate()
+        get_algorithm(algorithm)
+        self.algorithm = algorithm
 
-                # Push current for backtracking later
-                stack.append(current)
+        # Unseeded generators keep one private stream going between mazes
+        self._rng = make_rng(None, rng_backend)
 
-                # Move to neighbor
-                current = nxt
-                current.visited = True
-                visited_count += 1
-            else:
-                # Dead end, backtrack
-                if stack:
-                    current = stack.pop()
-                else:
-                    # Should not happen in a normal DFS maze, good to have anyway
-                    break
+    def with_seed(self, seed):
+        """
+        A generator like this one but seeded with seed (this one if seed is
+        None).
+        """
+        if seed is None:
+            return self
+        return MazeGenerator(random_seed=seed, algorithm=self.algorithm, rng_backend=self.rng_backend)
+
+    def _next_rng(self):
+        if self.random_seed is not None:
+            return make_rng(self.random_seed, self.rng_backend)
+        return self._rng
 
-        # Clear visited flags so they don't confuse other logic
-        for row in maze.cells:
-            for cell in row:
-                cell.visited = False
+    def generate(self, size, algorithm=None, progress=None):
+        """
+        Build a size x size maze. algorithm overrides the generator's default
+        for this call only. progress(done, total) is called now and then while
+        carving, raising GenerationCancelled from it stops generation.
+        """
+        carve = get_algorithm(algorithm or self.algorithm)
 
+        maze = Maze(size)
+        carve(maze.walls, size, size, self._next_rng(), progress)
         return maze
 
-    def _get_unvisited_neighbors(self, maze, cell):
-        out = []
-        for d in ("N", "E", "S", "W"):
-            nxt = maze.get_adjacent(cell, d)
-            if nxt is not None and not nxt.visited:
-                out.append(nxt)
-        return out
+    def generate_tiled(self, size, tile_size=None, processes=None, algorithm=None, progress=None):
+        """
+        Build a huge maze out of blocks carved in parallel processes and
+        stitched together (see tiled.py). Still a perfect maze, but not the
+        same one generate() would give for the same seed.
+        """
+        from tiled import DEFAULT_TILE_SIZE, generate_tiled
+
+        seed = self.random_seed
+        if seed is None:
+            seed = self._rng.randrange(2 ** 63)
+        return generate_tiled(
+            size, tile_size or DEFAULT_TILE_SIZE, seed=seed,
+            algorithm=algorithm or self.algorithm, rng_backend=self.rng_backend,
+            processes=processes, progress=progress,
+        )
+
+    def stream_rows(self, size, algorithm="eller"):
+        """
+        Streaming mode: yields the maze one row at a time as bytearrays of
+        wall flags, keeping only O(size) state. Needs a row algorithm
+        (eller, sidewinder or binary_tree). Pair with mazefile.write_rows()
+        to export mazes too big to hold in memory.
+        """
+        rows = get_row_algorithm(algorithm)
+        return rows(size, size, self._next_rng())
@@ -0,0 +1,103 @@
+# hint.py
+"""
+The "hint" overlay: the shortest way to the finish from wherever the player
+is right now.
+
+A MazeIndex hung from the finish gives every cell a parent one step closer
+to it, so the route from any cell is just its parent chain. The route is
+kept as a player.Trail, finish at the bottom and the player's cell on top.
+When the player moves, follow() climbs the parent chain from the new cell
+until it meets the route, pops the route down to that cell and pushes the
+climb. A step towards the finish pops one cell, a step away pushes one, so
+no move costs more than the change it makes.
+"""
+from player import Trail
+from solver import NO_PARENT
+
+
+class HintRoute:
+    """
+    Shortest route from a cell to the root of index (a mazeindex.MazeIndex
+    with root=maze.finish_cell), kept up to date with follow().
+
+    indices is the route as flat cell indices and contains_index() is O(1),
+    both from the Trail underneath. Cells whose look changed pile up in
+    dirty_cells for the renderer, see consume_dirty_cells().
+    """
+    def __init__(self, index):
+        self.index = index
+        self.maze = index.maze
+        self.route = Trail(index.maze)  # finish first, the followed cell last
+        self.dirty_cells = []
+
+    def __len__(self):
+        return len(self.route)
+
+    @property
+    def indices(self):
+        return self.route.indices
+
+    def contains_index(self, index):
+        return self.route.contains_index(index)
+
+    def follow(self, cell):
+        """
+        Make the route start at cell. Returns the number of cells pushed or
+        popped.
+        """
+        index = self.maze.index_of(cell)
+        indices = self.route.indices
+        if indices and indices[-1] == index:
+            return 0
+
+        parents = self.index.parent
+        if parents[index] == NO_PARENT:
+            # Can't reach the finish from here, no route to show
+            return self._pop_to(None)
+
+        # Climb towards the finish until the route (or, with no route yet,
+        # the finish itself)
+        climb = []
+        i = index
+        while not self.route.contains_index(i):
+            climb.append(i)
+            if i == self.index.root:
+                break
+            i = parents[i]
+
+        changed = self._pop_to(i if indices else None)
+        cell_at = self.maze.cell_at
+        for i in reversed(climb):
+            pushed = cell_at(i)
+            self.route.append(pushed)
+            self.dirty_cells.append(pushed)
+        return changed + len(climb)
+
+    def _pop_to(self, index):
+        """
+        Pop until index is on top (everything if index is None), returns
+        how many were popped.
+        """
+        route = self.route
+        indices = route.indices
+        popped = 0
+        while indices and indices[-1] != index:
+            self.dirty_cells.append(route.pop())
+            popped += 1
+        return popped
+
+    def cells(self):
+        """
+        The route as cells, from the followed cell to the finish.
+        """
+        cell_at = self.maze.cell_at
+        return [cell_at(i) for i in reversed(self.route.indices)]
+
+    def consume_dirty_cells(self):
+        """
+        Cells pushed onto or popped off the route since the last call.
+        Clears the list.
+        """
+        out = self.dirty_cells
+        self.dirty_cells = []
+        return out
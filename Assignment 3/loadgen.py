@@ -0,0 +1,201 @@
+# loadgen.py
+"""
+Load generator for server.py: opens lots of sessions at once and has each
+one walk maze solutions move by move, timing every reply.
+
+Every session connects, asks for a maze (GENERATE size seed, the seeds
+cycling through --mazes values so sessions share cached mazes), fetches
+its SOLUTION and sends one MOVE at a time along it, waiting for each reply.
+At the finish it asks for the next maze. After --duration seconds it prints
+moves per second and the move latency percentiles.
+
+Usage: python loadgen.py --sessions 2000 --size 50 --duration 10
+Add --spawn to start a server for the run (otherwise start server.py first).
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from array import array
+
+from profiler import percentile
+from server import DEFAULT_HOST, DEFAULT_PORT, raise_open_file_limit
+
+
+# Sessions connecting at the same time, so the listen backlog keeps up
+CONNECT_AT_ONCE = 256
+
+SPAWN_TIMEOUT = 10.0
+
+
+class Stats:
+    """
+    What all sessions did, latencies in seconds.
+    """
+    def __init__(self):
+        self.move_latencies = array("d")
+        self.generate_latencies = array("d")
+        self.mazes_finished = 0
+        self.errors = 0
+        # Sessions that got connected, or failed to
+        self.connected = 0
+        self.connect_failures = 0
+
+    def report(self, sessions, elapsed):
+        moves = sorted(t * 1000 for t in self.move_latencies)
+        gens = sorted(t * 1000 for t in self.generate_latencies)
+        rate = len(moves) / elapsed if elapsed > 0 else 0.0
+        return (
+            f"{self.connected} of {sessions} sessions connected, {len(moves)} moves in {elapsed:.2f}s ({rate:.0f} moves/s), "
+            f"{self.mazes_finished} mazes finished, {self.errors} errors\n"
+            f"move latency ms p50 {percentile(moves, 50):.2f} p95 {percentile(moves, 95):.2f} "
+            f"p99 {percentile(moves, 99):.2f} max {moves[-1] if moves else 0.0:.2f}\n"
+            f"generate latency ms p50 {percentile(gens, 50):.2f} p99 {percentile(gens, 99):.2f} "
+            f"({len(gens)} mazes)"
+        )
+
+
+async def _connect(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def _ask(reader, writer, line):
+    writer.write(line.encode("ascii") + b"\n")
+    reply = (await reader.readline()).decode("ascii").rstrip("\n")
+    if not reply:
+        raise ConnectionError("server closed the connection")
+    return reply
+
+
+async def run_session(number, args, stats, connect_gate, start, stop):
+    async with connect_gate:
+        try:
+            reader, writer = await _connect(args)
+        except OSError:
+            stats.connect_failures += 1
+            return
+    stats.connected += 1
+    try:
+        await start.wait()
+        k = 0
+        while not stop.is_set():
+            seed = args.seed + (number + k) % args.mazes
+            k += 1
+
+            t0 = time.perf_counter()
+            reply = await _ask(reader, writer, f"GENERATE {args.size} {seed}")
+            if not reply.startswith("OK"):
+                stats.errors += 1
+                return
+            stats.generate_latencies.append(time.perf_counter() - t0)
+
+            reply = await _ask(reader, writer, "SOLUTION")
+            directions = reply[3:]
+
+            for d in directions:
+                if stop.is_set():
+                    break
+                t0 = time.perf_counter()
+                reply = await _ask(reader, writer, "MOVE " + d)
+                stats.move_latencies.append(time.perf_counter() - t0)
+                if not reply.startswith("OK 1"):
+                    stats.errors += 1
+            else:
+                stats.mazes_finished += 1
+
+        await _ask(reader, writer, "QUIT")
+    except ConnectionError:
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    stats = Stats()
+    connect_gate = asyncio.Semaphore(CONNECT_AT_ONCE)
+    start = asyncio.Event()
+    stop = asyncio.Event()
+
+    tasks = [
+        asyncio.ensure_future(run_session(i, args, stats, connect_gate, start, stop))
+        for i in range(args.sessions)
+    ]
+
+    # Everyone connects first, then the clock starts
+    while stats.connected + stats.connect_failures < args.sessions:
+        await asyncio.sleep(0.05)
+
+    t0 = time.perf_counter()
+    start.set()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    elapsed = time.perf_counter() - t0
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    stats.errors += sum(1 for r in results if isinstance(r, Exception))
+    return stats, elapsed
+
+
+def spawn_server(args):
+    """
+    Start server.py in its own process and wait until it takes connections.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    cmd = [sys.executable, os.path.join(here, "server.py")]
+    cmd += ["--unix", args.unix] if args.unix else ["--host", args.host, "--port", str(args.port)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+    async def wait_up():
+        deadline = time.perf_counter() + SPAWN_TIMEOUT
+        while True:
+            try:
+                _, writer = await _connect(args)
+                writer.close()
+                return
+            except OSError:
+                if time.perf_counter() > deadline or proc.poll() is not None:
+                    raise RuntimeError("server.py didn't start")
+                await asyncio.sleep(0.1)
+
+    asyncio.run(wait_up())
+    return proc
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Put server.py under load and report moves/s and latency.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--mazes", type=int, default=8, help="different seeds the sessions play")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--spawn", action="store_true", help="start a server.py for the run")
+    args = parser.parse_args(argv)
+    if args.sessions < 1 or args.mazes < 1:
+        parser.error("--sessions and --mazes must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    raise_open_file_limit()
+
+    proc = spawn_server(args) if args.spawn else None
+    try:
+        stats, elapsed = asyncio.run(run(args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    print(stats.report(args.sessions, elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,22 @@
 # main.py
+import argparse
+import os
 import sys
+import time
 import pygame
 
 from maze import Maze
 from generator import MazeGenerator
 from player import Player
 from renderer import Renderer
-from ui import UIControls
+from ui import UIControls, MIN_SIZE, MAX_SIZE
+from solver import solve_path, solve_with_parents
+from worker import GenerationWorker
+from mazepool import MazePool
+from hint import HintRoute
+from mazeindex import MazeIndex
+from replay import make_source
+from profiler import FrameProfiler, DEFAULT_TRACE_PATH
 
 
 # Window size
@@ -19,6 +29,13 @@ UI_BAR_H = 70
 # Frame rate cap
 FPS = 60
 
+# Only redraw the parts of the window that changed (and nothing when idle)
+INCREMENTAL_RENDER = True
+
+# Ready-made mazes kept per recently used size, and the pool's memory cap
+POOL_PER_SIZE = 2
+POOL_MEMORY_CAP = 64 * 1024 * 1024
+
 
 # Simple game states
 STATE_WAITING = "WAITING"
@@ -29,86 +46,148 @@ STATE_WON = "WON"
 def build_solution_path(maze, start_cell, finish_cell):
     """
     Build a solution path as a list of cells from start to finish.
-    Uses Breadth-First Search.
+    Uses a level-by-level Breadth-First Search, see solver.py.
     """
-    from collections import deque
-
-    q = deque()
-    q.append(start_cell)
-
-    came_from = {start_cell: None}
-
-    while q:
-        cur = q.popleft()
-        if cur == finish_cell:
-            break
-
-        for nxt in maze.get_neighbors(cur):
-            if nxt not in came_from:
-                came_from[nxt] = cur
-                q.append(nxt)
-
-    if finish_cell not in came_from:
-        return []
-
-    # Reconstruct path backwards
-    path = []
-    cur = finish_cell
-    while cur is not None:
-        path.append(cur)
-        cur = came_from[cur]
-    path.reverse()
-    return path
+    return solve_path(maze, start_cell, finish_cell)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Maze game.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="FILE", help="save this session's input to FILE")
+    mode.add_argument("--replay", metavar="FILE", help="play back a session saved with --record")
+    mode.add_argument("--autoplay", type=int, metavar="SIZE",
+                      help="generate SIZE x SIZE mazes and walk their solutions")
+    parser.add_argument("--runs", type=int, default=1, help="mazes to walk with --autoplay")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay/autoplay at normal speed instead of as fast as possible")
+    parser.add_argument("--seed", type=int, default=None, help="maze generator seed")
+    parser.add_argument("--headless", action="store_true", help="run without a window")
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler on (F3 toggles it)")
+    parser.add_argument("--profile-out", metavar="FILE", default=DEFAULT_TRACE_PATH,
+                        help="where the profiler writes its frame trace (.csv or .json)")
+    args = parser.parse_args(argv)
+    # The size box would turn anything else down and autoplay would wait forever
+    if args.autoplay is not None and not MIN_SIZE <= args.autoplay <= MAX_SIZE:
+        parser.error(f"--autoplay SIZE must be between {MIN_SIZE} and {MAX_SIZE}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
 
-
-def main():
     pygame.init()
     pygame.display.set_caption("Maze Game")
 
     screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
     clock = pygame.time.Clock()
 
-    generator = MazeGenerator()
-    renderer = Renderer(window_w=WINDOW_W, window_h=WINDOW_H, ui_bar_h=UI_BAR_H)
     ui = UIControls(window_w=WINDOW_W, ui_bar_h=UI_BAR_H)
+
+    # Where input comes from: the keyboard, a recording or the autoplayer
+    source, seed = make_source(args, ui, (WINDOW_W, WINDOW_H))
+    fps = FPS if source.fps is None else source.fps
+
+    generator = MazeGenerator(random_seed=seed)
+    worker = GenerationWorker(generator)
+    # Ready-made mazes would come from the pool in whatever order it built
+    # them, not from the seeds a recording or replay asks for. The pool
+    # refills on its own thread, so it gets its own generator (and RNG).
+    pool = None
+    if seed is None:
+        pool = MazePool(MazeGenerator(), per_size=POOL_PER_SIZE, memory_cap=POOL_MEMORY_CAP)
+    renderer = Renderer(window_w=WINDOW_W, window_h=WINDOW_H, ui_bar_h=UI_BAR_H)
     player = Player()
 
+    # Frame profiler, F3 turns it on and off. Off, prof below is None.
+    profiler = FrameProfiler(trace_path=args.profile_out)
+    profiler.set_enabled(args.profile)
+    toggle_profiler = False
+
     maze = None
     game_state = STATE_WAITING
 
     # Easter egg solve path
     solution_path = []
+    # Tree queries on the current maze, hung from the finish so every cell's
+    # parent is its way there (for the hint). Built from the BFS the solve
+    # already ran.
+    maze_index = None
     show_solution = False
 
-    # Typed buffer for "solve"
+    # Live route from the player to the finish, typing "hint" toggles it
+    # (a HintRoute while it's on)
+    hint = None
+
+    # Typed buffer for "solve" and "hint"
     typed_buffer = ""
 
+    # Set when the OS asks for the whole window to be repainted
+    needs_full_redraw = True
+
+    # Last (stage, percent) shown on the status line while generating
+    shown_progress = None
+
+    # A finished maze the source isn't ready to swap in yet (a replay that
+    # hasn't reached the point the recording got it)
+    held = None
+
     # Create a default maze so the window isn't blank
     default_size = 10
-    maze = generator.generate(default_size)
+    t0 = time.perf_counter()
+    maze = generator.with_seed(source.next_seed()).generate(default_size)
+    t1 = time.perf_counter()
     player.reset(maze.start_cell)
-    solution_path = build_solution_path(maze, maze.start_cell, maze.finish_cell)
+    solution_path, parents = solve_with_parents(maze, maze.start_cell, maze.finish_cell)
+    maze_index = MazeIndex(maze, root=maze.finish_cell, parents=parents)
+    profiler.job("generate", default_size, (t1 - t0) * 1000)
+    profiler.job("solve", default_size, (time.perf_counter() - t1) * 1000)
     game_state = STATE_PLAYING
     ui.set_status("Maze generated. Use arrow keys to move.")
+    source.maze_ready(maze, player, solution_path)
+
+    # Start keeping a few mazes of the default size ready
+    if pool is not None:
+        pool.note_used(default_size)
+        pool.start()
 
     running = True
     while running:
-        dt_ms = clock.tick(FPS)
+        dt_ms = clock.tick(fps)
+        prof = profiler.begin_frame(dt_ms)
+        renderer.profiler = prof
 
-        for event in pygame.event.get():
+        for event in source.get(generating=worker.busy or held is not None):
             if event.type == pygame.QUIT:
                 running = False
                 continue
 
+            if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                needs_full_redraw = True
+
             # Mouse clicks for UI
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 ui.handle_mouse_click(event.pos)
 
+            # Mouse wheel zooms the maze view
+            if event.type == pygame.MOUSEWHEEL and maze is not None:
+                if event.y > 0:
+                    renderer.zoom_in(maze)
+                elif event.y < 0:
+                    renderer.zoom_out(maze)
+
             if event.type == pygame.KEYDOWN:
+                # F3 turns the profiler on or off, once this frame is done
+                if event.key == pygame.K_F3:
+                    toggle_profiler = True
+                    continue
+
                 # Feed typing to the UI first (for size input)
                 ui.handle_key_down(event.key, event.unicode)
 
-                # Track typed letters for "solve"
+                # Track typed letters for "solve" and "hint"
                 if event.unicode and event.unicode.isprintable():
                     typed_buffer += event.unicode.lower()
                     typed_buffer = typed_buffer[-10:]  # keep it short
@@ -122,6 +201,28 @@ def main():
                     else:
                         ui.set_status("Solution overlay OFF.")
 
+                # "hint" shows the way to the finish from wherever the player is
+                if "hint" in typed_buffer and maze is not None:
+                    typed_buffer = ""
+                    if hint is None:
+                        hint = HintRoute(maze_index)
+                        hint.follow(player.current_cell)
+                        # Toggling it redraws everything anyway
+                        hint.consume_dirty_cells()
+                        ui.set_status("Hint ON: the way to the finish from here.")
+                    else:
+                        hint = None
+                        ui.set_status("Hint OFF.")
+
+                # +/- zoom, 0 goes back to fitting the window (unless typing a size)
+                if maze is not None and not ui.active_input:
+                    if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                        renderer.zoom_in(maze)
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        renderer.zoom_out(maze)
+                    elif event.key in (pygame.K_0, pygame.K_KP0):
+                        renderer.set_zoom(None)
+
                 # Arrow keys move the player, but only if game is active
                 if maze is not None and game_state in (STATE_PLAYING,):
                     direction = None
@@ -135,7 +236,13 @@ def main():
                         direction = "W"
 
                     if direction is not None:
+                        if prof is not None:
+                            prof.mark("events")
                         moved = player.try_move(direction, maze)
+                        if moved and hint is not None:
+                            hint.follow(player.current_cell)
+                        if prof is not None:
+                            prof.mark("move")
                         if moved:
                             # Win check
                             if player.current_cell == maze.finish_cell:
@@ -145,33 +252,142 @@ def main():
                             # No move is fine, just don't spam status
                             pass
 
-        # If the UI says "generate was clicked", try to generate a new maze
+        if prof is not None:
+            prof.mark("events")
+
+        # A finished maze to swap in this frame, from the pool or the worker
+        result = None
+
+        # If the UI says "generate was clicked", start generating a new maze in
+        # the background (or cancel the one that's already on its way)
         if ui.consume_generate_clicked():
-            size, err = ui.get_requested_size()
-            if err is not None:
-                ui.set_error(err)
+            if worker.busy or held is not None:
+                worker.cancel()
+                held = None
+                ui.set_status("Generation cancelled.")
+            else:
+                size, err = ui.get_requested_size()
+                if err is not None:
+                    ui.set_error(err)
+                else:
+                    if pool is not None:
+                        pool.note_used(size)
+                        result = pool.take(size)
+                    if result is None:
+                        worker.start(size, seed=source.next_seed())
+                        shown_progress = None
+                        ui.set_status(f"Generating {size}x{size} maze...")
+
+        # The old maze stays playable until the new one is ready
+        if result is None:
+            result = held if held is not None else worker.poll()
+            held = None
+        if result is not None and result.error is None and not source.can_swap():
+            held = result
+            result = None
+        if result is not None:
+            if result.error is not None:
+                ui.set_error(f"Maze generation failed: {result.error}")
             else:
-                maze = generator.generate(size)
+                for name, ms in result.timings.items():
+                    profiler.job(name, result.size, ms)
+                maze = result.maze
                 player.reset(maze.start_cell)
-                solution_path = build_solution_path(maze, maze.start_cell, maze.finish_cell)
+                solution_path = result.solution_path
+                maze_index = MazeIndex(maze, root=maze.finish_cell, parents=result.parents)
                 show_solution = False
+                hint = None
                 game_state = STATE_PLAYING
-                ui.set_status(f"Generated {size}x{size} maze. Use arrow keys to move.")
+                ui.set_status(f"Generated {result.size}x{result.size} maze. Use arrow keys to move.")
+                source.maze_ready(maze, player, solution_path)
+        elif worker.busy:
+            stage, fraction = worker.progress()
+            progress = (stage, int(fraction * 100))
+            if progress != shown_progress:
+                shown_progress = progress
+                ui.set_status(f"{stage} {worker.size}x{worker.size} maze... {progress[1]}% (click Generate to cancel)")
+
+        # Refill the pool only while nothing is being generated for the player
+        if pool is not None:
+            pool.set_paused(worker.busy)
+        if prof is not None:
+            prof.mark("generation")
 
         # Draw everything
-        renderer.render(
-            screen=screen,
-            maze=maze,
-            player=player,
-            ui=ui,
-            game_state=game_state,
-            solution_path=solution_path if show_solution else []
-        )
-
-        pygame.display.flip()
-
+        if INCREMENTAL_RENDER:
+            rects = renderer.render_dirty(
+                screen=screen,
+                maze=maze,
+                player=player,
+                ui=ui,
+                game_state=game_state,
+                solution_path=solution_path if show_solution else [],
+                dirty_cells=player.consume_dirty_cells() + (hint.consume_dirty_cells() if hint is not None else []),
+                ui_dirty=ui.consume_dirty(),
+                full=needs_full_redraw,
+                hint=hint
+            )
+            needs_full_redraw = False
+            if prof is not None:
+                prof.mark("render")
+                rects.append(profiler.draw(screen, WINDOW_W - 10, UI_BAR_H + 10))
+                prof.mark("profiler")
+
+            # Nothing changed, nothing to push
+            if rects:
+                pygame.display.update(rects)
+        else:
+            # A full redraw doesn't need the dirty cells, but they'd pile up
+            # move after move if nothing took them
+            player.consume_dirty_cells()
+            if hint is not None:
+                hint.consume_dirty_cells()
+            renderer.render(
+                screen=screen,
+                maze=maze,
+                player=player,
+                ui=ui,
+                game_state=game_state,
+                solution_path=solution_path if show_solution else [],
+                hint=hint
+            )
+            if prof is not None:
+                prof.mark("render")
+                profiler.draw(screen, WINDOW_W - 10, UI_BAR_H + 10)
+                prof.mark("profiler")
+
+            pygame.display.flip()
+
+        if prof is not None:
+            prof.mark("present")
+            prof.end_frame()
+        if toggle_profiler:
+            toggle_profiler = False
+            trace = profiler.toggle()
+            if profiler.enabled:
+                ui.set_status("Profiler ON (F3 to stop and save the trace).")
+            else:
+                ui.set_status(f"Profiler OFF. Trace saved to {trace}." if trace else "Profiler OFF.")
+                # Clears the overlay off the screen
+                needs_full_redraw = True
+
+        source.frame_done()
+
+    source.finish()
+    # Write the trace if it's still running
+    trace = profiler.set_enabled(False)
+    if trace:
+        print(f"Frame trace saved to {trace}")
+    if args.record or args.replay or args.autoplay:
+        print(source.report())
+    if source.error is not None:
+        print(source.error, file=sys.stderr)
+
+    if pool is not None:
+        pool.stop()
+    worker.cancel()
     pygame.quit()
-    sys.exit()
+    sys.exit(1 if source.error is not None else 0)
 
 
 if __name__ == "__main__":
@@ -1,78 +1,259 @@
 # maze.py
+
+# Walls are stored as bit flags, one byte per cell.
+# A set bit means the wall is present.
+WALL_N = 1
+WALL_E = 2
+WALL_S = 4
+WALL_W = 8
+ALL_WALLS = WALL_N | WALL_E | WALL_S | WALL_W
+
+# Masks that clear one wall bit (walls[i] &= NOT_E knocks down the east wall)
+NOT_N = ~WALL_N & 0xFF
+NOT_E = ~WALL_E & 0xFF
+NOT_S = ~WALL_S & 0xFF
+NOT_W = ~WALL_W & 0xFF
+
+# Spare bit used by the generator while carving
+VISITED = 16
+
+DIRECTIONS = ("N", "E", "S", "W")
+
+# direction -> (wall bit, wall bit on the other side, row offset, col offset)
+DIRECTION_INFO = {
+    "N": (WALL_N, WALL_S, -1, 0),
+    "E": (WALL_E, WALL_W, 0, 1),
+    "S": (WALL_S, WALL_N, 1, 0),
+    "W": (WALL_W, WALL_E, 0, -1),
+}
+
+# Lookup table for bytes.translate() that drops the visited bit
+_CLEAR_VISITED = bytes(b & ~VISITED & 0xFF for b in range(256))
+
+
 class Cell:
     """
-    One cell in the maze grid.
-    Walls start as True (present). Maze generation removes walls to carve paths.
+    Lightweight view of one cell in the maze grid.
+    The wall data lives in Maze.walls, this just points at it by row/col.
+    Two views of the same cell compare equal, so they work as dict keys.
     """
-    __slots__ = ("row", "col", "wall_n", "wall_e", "wall_s", "wall_w", "visited")
+    __slots__ = ("maze", "row", "col")
 
-    def __init__(self, row, col):
+    def __init__(self, maze, row, col):
+        self.maze = maze
         self.row = row
         self.col = col
 
-        # Walls exist at the start
-        self.wall_n = True
-        self.wall_e = True
-        self.wall_s = True
-        self.wall_w = True
+    @property
+    def index(self):
+        return self.row * self.maze.size + self.col
+
+    def _get_bit(self, bit):
+        return bool(self.maze.walls[self.index] & bit)
+
+    def _set_bit(self, bit, value):
+        i = self.index
+        if value:
+            self.maze.walls[i] |= bit
+        else:
+            self.maze.walls[i] &= ~bit
+
+    @property
+    def wall_n(self):
+        return self._get_bit(WALL_N)
+
+    @wall_n.setter
+    def wall_n(self, value):
+        self._set_bit(WALL_N, value)
+
+    @property
+    def wall_e(self):
+        return self._get_bit(WALL_E)
+
+    @wall_e.setter
+    def wall_e(self, value):
+        self._set_bit(WALL_E, value)
 
-        # Used by generator
-        self.visited = False
+    @property
+    def wall_s(self):
+        return self._get_bit(WALL_S)
+
+    @wall_s.setter
+    def wall_s(self, value):
+        self._set_bit(WALL_S, value)
+
+    @property
+    def wall_w(self):
+        return self._get_bit(WALL_W)
+
+    @wall_w.setter
+    def wall_w(self, value):
+        self._set_bit(WALL_W, value)
+
+    @property
+    def visited(self):
+        return self._get_bit(VISITED)
+
+    @visited.setter
+    def visited(self, value):
+        self._set_bit(VISITED, value)
+
+    def __eq__(self, other):
+        if not isinstance(other, Cell):
+            return NotImplemented
+        return self.row == other.row and self.col == other.col and self.maze is other.maze
+
+    def __hash__(self):
+        return hash((self.row, self.col))
 
     def __repr__(self):
         return f"Cell({self.row},{self.col})"
 
 
+class _CellRow:
+    """
+    One row of the grid view, so maze.cells[r][c] keeps working.
+    """
+    __slots__ = ("maze", "row")
+
+    def __init__(self, maze, row):
+        self.maze = maze
+        self.row = row
+
+    def __len__(self):
+        return self.maze.size
+
+    def __getitem__(self, col):
+        size = self.maze.size
+        if col < 0:
+            col += size
+        if not 0 <= col < size:
+            raise IndexError("cell column out of range")
+        return Cell(self.maze, self.row, col)
+
+    def __iter__(self):
+        for c in range(self.maze.size):
+            yield Cell(self.maze, self.row, c)
+
+
+class _CellGrid:
+    """
+    Read-only 2D view over the flat wall array: cells[row][col].
+    Cells are created on access, nothing is stored per cell.
+    """
+    __slots__ = ("maze",)
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def __len__(self):
+        return self.maze.size
+
+    def __getitem__(self, row):
+        size = self.maze.size
+        if row < 0:
+            row += size
+        if not 0 <= row < size:
+            raise IndexError("cell row out of range")
+        return _CellRow(self.maze, row)
+
+    def __iter__(self):
+        for r in range(self.maze.size):
+            yield _CellRow(self.maze, r)
+
+
 class Maze:
     """
-    Holds a grid of cells plus helper functions for movement and neighbor lookup.
+    Holds the wall data for a size x size grid plus helper functions for
+    movement and neighbor lookup.
+
+    Walls live in one flat bytearray indexed by row * size + col, each byte
+    holds the WALL_* bit flags for that cell.
+
+    walls can also be passed in, anything indexable that holds size * size
+    bytes works (a memoryview over a memory-mapped file, for example).
     """
-    def __init__(self, size):
+    def __init__(self, size, walls=None):
         self.size = size
 
-        # 2D grid: cells[row][col]
-        self.cells = [[Cell(r, c) for c in range(size)] for r in range(size)]
+        if walls is None:
+            # Every wall exists at the start
+            walls = bytearray([ALL_WALLS]) * (size * size)
+        elif len(walls) != size * size:
+            raise ValueError(f"Expected {size * size} wall bytes for a {size}x{size} maze, got {len(walls)}")
+        self.walls = walls
+
+        # 2D view: cells[row][col]
+        self.cells = _CellGrid(self)
 
-        self.start_cell = self.cells[0][0]
-        self.finish_cell = self.cells[size - 1][size - 1]
+        self.start_cell = Cell(self, 0, 0)
+        self.finish_cell = Cell(self, size - 1, size - 1)
+
+    @classmethod
+    def open_mapped(cls, path):
+        """
+        Memory-map a maze file written by mazefile.save() or write_rows().
+        The walls are read straight from the file as they're needed, so only
+        the parts that get rendered or solved are paged in. Read-only.
+        """
+        from mazefile import open_mapped
+        return open_mapped(path)
 
     def get_cell(self, row, col):
-        return self.cells[row][col]
+        return Cell(self, row, col)
+
+    def cell_at(self, index):
+        """
+        Cell for a flat index (row * size + col).
+        """
+        row, col = divmod(index, self.size)
+        return Cell(self, row, col)
+
+    def index_of(self, cell):
+        return cell.row * self.size + cell.col
+
+    def wall_bytes(self):
+        """
+        The walls as one byte per cell, for code that reads them in bulk
+        (np.frombuffer, long loops). Packed walls (mazefile.PackedWalls) are
+        decoded into a new bytearray, anything else is returned as it is.
+        """
+        unpack = getattr(self.walls, "unpack", None)
+        if unpack is not None:
+            return unpack()
+        return self.walls
 
     def in_bounds(self, row, col):
         return 0 <= row < self.size and 0 <= col < self.size
 
+    def clear_visited(self):
+        """
+        Drop the generator's visited bit from every cell.
+        """
+        self.walls[:] = self.walls.translate(_CLEAR_VISITED)
+
     def get_adjacent(self, cell, direction):
         """
         Return the adjacent cell in a direction, or None if out of bounds.
         Direction is 'N', 'E', 'S', or 'W'
         """
-        dr, dc = 0, 0
-        if direction == "N":
-            dr = -1
-        elif direction == "E":
-            dc = 1
-        elif direction == "S":
-            dr = 1
-        elif direction == "W":
-            dc = -1
+        info = DIRECTION_INFO.get(direction)
+        if info is None:
+            dr, dc = 0, 0
+        else:
+            dr, dc = info[2], info[3]
 
         nr = cell.row + dr
         nc = cell.col + dc
         if not self.in_bounds(nr, nc):
             return None
-        return self.cells[nr][nc]
+        return Cell(self, nr, nc)
 
     def has_wall(self, cell, direction):
-        if direction == "N":
-            return cell.wall_n
-        if direction == "E":
-            return cell.wall_e
-        if direction == "S":
-            return cell.wall_s
-        if direction == "W":
-            return cell.wall_w
-        return True
+        info = DIRECTION_INFO.get(direction)
+        if info is None:
+            return True
+        return bool(self.walls[cell.row * self.size + cell.col] & info[0])
 
     def remove_wall_between(self, a, b):
         """
@@ -83,20 +264,22 @@ class Maze:
 
         if dr == -1 and dc == 0:
             # b is north of a
-            a.wall_n = False
-            b.wall_s = False
+            bit_a, bit_b = WALL_N, WALL_S
         elif dr == 1 and dc == 0:
             # b is south of a
-            a.wall_s = False
-            b.wall_n = False
+            bit_a, bit_b = WALL_S, WALL_N
         elif dr == 0 and dc == 1:
             # b is east of a
-            a.wall_e = False
-            b.wall_w = False
+            bit_a, bit_b = WALL_E, WALL_W
         elif dr == 0 and dc == -1:
             # b is west of a
-            a.wall_w = False
-            b.wall_e = False
+            bit_a, bit_b = WALL_W, WALL_E
+        else:
+            return
+
+        walls = self.walls
+        walls[a.row * self.size + a.col] &= ~bit_a
+        walls[b.row * self.size + b.col] &= ~bit_b
 
     def can_move(self, from_cell, direction):
         """
@@ -113,9 +296,12 @@ class Maze:
         Useful for solution finding
         """
         out = []
-        for d in ("N", "E", "S", "W"):
-            if not self.has_wall(cell, d):
-                nxt = self.get_adjacent(cell, d)
-                if nxt is not None:
-                    out.append(nxt)
+        w = self.walls[cell.row * self.size + cell.col]
+        for d in DIRECTIONS:
+            bit, _, dr, dc = DIRECTION_INFO[d]
+            if not w & bit:
+                nr = cell.row + dr
+                nc = cell.col + dc
+                if self.in_bounds(nr, nc):
+                    out.append(Cell(self, nr, nc))
         return out
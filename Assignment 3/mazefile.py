@@ -0,0 +1,335 @@
+# mazefile.py
+"""
+On-disk maze files.
+
+Version 2 layout (little endian):
+    32 byte header: b"MAZE", version (u16), flags (u16), size (u32),
+                    start index (u32), finish index (u32),
+                    solution length (u32), padding
+    wall data, one row after another:
+        unpacked: size bytes per row, one byte of wall flags per cell
+        packed (FLAG_PACKED): (size + 1) // 2 bytes per row, two cells per
+            byte, the even column in the low 4 bits
+    solution (FLAG_SOLUTION): solution length u32 cell indices, start first
+
+Version 1 files (16 byte header, unpacked walls, no solution) can still be
+read.
+
+Rows are written as they come, so a maze produced by a row generator never
+has to be held in memory in full. Reading goes through mmap and doesn't copy:
+unpacked walls are used straight from the mapping, packed ones through a
+PackedWalls view that decodes cells on access. Pass unpack=True to load()
+to get a regular bytearray-backed maze instead.
+"""
+import mmap
+import struct
+from array import array
+
+from maze import Maze, WALL_N, WALL_E, WALL_S, WALL_W
+
+
+MAGIC = b"MAZE"
+VERSION = 2
+
+FLAG_PACKED = 1
+FLAG_SOLUTION = 2
+
+_HEADER = struct.Struct("<4sHHIIII8x")
+HEADER_SIZE = _HEADER.size
+
+_HEADER_V1 = struct.Struct("<4sHHI4x")
+HEADER_SIZE_V1 = _HEADER_V1.size
+
+# bytes.translate() tables for packing and unpacking nibbles
+_SHIFT_UP = bytes((b << 4) & 0xFF for b in range(256))
+_LOW_NIBBLE = bytes(b & 0x0F for b in range(256))
+_HIGH_NIBBLE = bytes(b >> 4 for b in range(256))
+
+
+def pack_row(row):
+    """
+    Pack a row of wall flags two cells per byte (even column in the low bits).
+    """
+    even = bytes(row[0::2])
+    odd = bytes(row[1::2]).translate(_SHIFT_UP)
+    n = len(even)
+    # OR the two halves together in one go through big ints
+    merged = int.from_bytes(even, "little") | int.from_bytes(odd, "little")
+    return merged.to_bytes(n, "little")
+
+
+def unpack_row(packed, size):
+    """
+    Undo pack_row(), returns a bytearray of size cells.
+    """
+    out = bytearray(2 * len(packed))
+    out[0::2] = packed.translate(_LOW_NIBBLE)
+    out[1::2] = packed.translate(_HIGH_NIBBLE)
+    del out[size:]
+    return out
+
+
+class PackedWalls:
+    """
+    Read-only view over packed wall data (see the module docstring), so a
+    Maze can use a packed, memory-mapped file without unpacking it. Indexing
+    gives the wall flags of one cell, like a bytearray would.
+    """
+    __slots__ = ("buf", "size", "stride")
+
+    def __init__(self, buf, size):
+        self.buf = buf
+        self.size = size
+        self.stride = (size + 1) // 2
+
+    def __len__(self):
+        return self.size * self.size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if start >= stop:
+                return bytearray()
+            r0 = start // self.size
+            r1 = (stop - 1) // self.size + 1
+            rows = self.unpack_rows(r0, r1)
+            base = r0 * self.size
+            return rows[start - base:stop - base:step]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("cell index out of range")
+
+        r, c = divmod(i, self.size)
+        b = self.buf[r * self.stride + (c >> 1)]
+        return b >> 4 if c & 1 else b & 0x0F
+
+    def __iter__(self):
+        for r in range(self.size):
+            yield from self.unpack_rows(r, r + 1)
+
+    def unpack_rows(self, r0, r1):
+        """
+        Rows r0 up to r1 as one bytearray of wall flags.
+        """
+        out = bytearray()
+        for r in range(r0, r1):
+            start = r * self.stride
+            out += unpack_row(bytes(self.buf[start:start + self.stride]), self.size)
+        return out
+
+    def unpack(self):
+        """
+        The whole grid as a bytearray (a copy, one byte per cell).
+        """
+        return self.unpack_rows(0, self.size)
+
+
+def _write_header(f, size, flags=0, start=0, finish=None, solution_len=0):
+    if finish is None:
+        finish = size * size - 1
+    f.write(_HEADER.pack(MAGIC, VERSION, flags, size, start, finish, solution_len))
+
+
+def write_rows(path, size, rows, packed=False):
+    """
+    Write a size x size maze to path, one row of wall flags at a time.
+    rows is any iterable of size-byte rows (e.g. MazeGenerator.stream_rows).
+    """
+    count = 0
+    with open(path, "wb") as f:
+        _write_header(f, size, FLAG_PACKED if packed else 0)
+        for row in rows:
+            if len(row) != size:
+                raise ValueError(f"Row {count} has {len(row)} cells, expected {size}")
+            f.write(pack_row(row) if packed else row)
+            count += 1
+
+    if count != size:
+        raise ValueError(f"Got {count} rows, expected {size}")
+
+
+def save(path, maze, solution_path=None, packed=True):
+    """
+    Save a maze, and optionally its solution (a list of cells), to path.
+    Unpacked walls are written straight from the maze's buffer.
+    """
+    with open(path, "wb") as f:
+        write_record(f, maze, solution_path, packed)
+
+
+def write_record(f, maze, solution_path=None, packed=True):
+    """
+    Write one maze in the save() format to an open binary file, at its
+    current position. Several records can follow each other in one file
+    (see batch.py), load() them back with offset=. Returns bytes written.
+    """
+    size = maze.size
+    flags = 0
+    if packed:
+        flags |= FLAG_PACKED
+    if solution_path:
+        flags |= FLAG_SOLUTION
+
+    start_pos = f.tell()
+    _write_header(
+        f, size, flags,
+        start=maze.index_of(maze.start_cell),
+        finish=maze.index_of(maze.finish_cell),
+        solution_len=len(solution_path) if solution_path else 0,
+    )
+
+    walls = maze.walls
+    if not packed and isinstance(walls, (bytes, bytearray, memoryview)):
+        f.write(walls)
+    else:
+        for r in range(size):
+            row = walls[r * size:(r + 1) * size]
+            f.write(pack_row(row) if packed else bytes(row))
+
+    if solution_path:
+        indices = array("I", (c.row * size + c.col for c in solution_path))
+        f.write(indices.tobytes())
+
+    return f.tell() - start_pos
+
+
+def write_maze(path, maze):
+    """
+    Write an in-memory maze unpacked, without a solution.
+    """
+    save(path, maze, packed=False)
+
+
+def read_header(f):
+    """
+    Reads an open file's header. Returns a dict with size, flags, start,
+    finish, solution_len and data_offset (where the wall data starts).
+    """
+    raw = f.read(HEADER_SIZE_V1)
+    if len(raw) != HEADER_SIZE_V1:
+        raise ValueError("File is too short to be a maze file")
+
+    magic, version, _, size = _HEADER_V1.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("Not a maze file")
+
+    if version == 1:
+        return {
+            "size": size, "flags": 0, "start": 0, "finish": size * size - 1,
+            "solution_len": 0, "data_offset": HEADER_SIZE_V1,
+        }
+    if version != VERSION:
+        raise ValueError(f"Unsupported maze file version {version}")
+
+    raw += f.read(HEADER_SIZE - HEADER_SIZE_V1)
+    if len(raw) != HEADER_SIZE:
+        raise ValueError("File is too short to be a maze file")
+    _, _, flags, size, start, finish, solution_len = _HEADER.unpack(raw)
+    return {
+        "size": size, "flags": flags, "start": start, "finish": finish,
+        "solution_len": solution_len, "data_offset": HEADER_SIZE,
+    }
+
+
+def load(path, unpack=False, offset=0):
+    """
+    Memory-map a maze file. Returns (maze, solution_path), solution_path is
+    [] if the file doesn't have one. offset is where the record starts, for
+    files holding several (see write_record).
+
+    The maze is read-only and backed by the mapping, unless unpack=True, in
+    which case the walls are copied into a regular bytearray.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        header = read_header(f)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    size = header["size"]
+    packed = header["flags"] & FLAG_PACKED
+    data_size = ((size + 1) // 2 if packed else size) * size
+    offset += header["data_offset"]
+    view = memoryview(mm)
+
+    data = view[offset:offset + data_size]
+    if len(data) != data_size:
+        raise ValueError("Maze file is truncated")
+
+    if packed:
+        walls = PackedWalls(data, size)
+        if unpack:
+            walls = walls.unpack()
+    else:
+        walls = bytearray(data) if unpack else data
+
+    maze = Maze(size, walls=walls)
+    maze.start_cell = maze.cell_at(header["start"])
+    maze.finish_cell = maze.cell_at(header["finish"])
+
+    solution_path = []
+    if header["flags"] & FLAG_SOLUTION:
+        start = offset + data_size
+        raw = view[start:start + 4 * header["solution_len"]]
+        indices = array("I")
+        indices.frombytes(raw)
+        cell_at = maze.cell_at
+        solution_path = [cell_at(i) for i in indices]
+
+    return maze, solution_path
+
+
+def open_mapped(path):
+    """
+    Memory-map a maze file and wrap it in a read-only Maze.
+    """
+    maze, _ = load(path)
+    return maze
+
+
+def to_text(maze, solution_path=None):
+    """
+    Plain ASCII drawing of the maze, for debugging. Solution cells get a '*',
+    start and finish are marked S and F.
+    """
+    size = maze.size
+    walls = maze.walls
+    on_path = {maze.index_of(c) for c in solution_path} if solution_path else set()
+    start = maze.index_of(maze.start_cell)
+    finish = maze.index_of(maze.finish_cell)
+
+    lines = []
+    for r in range(size):
+        base = r * size
+        top = ["+"]
+        mid = []
+        for c in range(size):
+            i = base + c
+            w = walls[i]
+            top.append("---+" if w & WALL_N else "   +")
+            if c == 0:
+                mid.append("|" if w & WALL_W else " ")
+            if i == start:
+                mark = " S "
+            elif i == finish:
+                mark = " F "
+            elif i in on_path:
+                mark = " * "
+            else:
+                mark = "   "
+            mid.append(mark + ("|" if w & WALL_E else " "))
+        lines.append("".join(top))
+        lines.append("".join(mid))
+
+    bottom = ["+"]
+    base = (size - 1) * size
+    for c in range(size):
+        bottom.append("---+" if walls[base + c] & WALL_S else "   +")
+    lines.append("".join(bottom))
+    return "\n".join(lines) + "\n"
+
+
+def export_text(path, maze, solution_path=None):
+    with open(path, "w") as f:
+        f.write(to_text(maze, solution_path))
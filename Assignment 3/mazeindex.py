@@ -0,0 +1,168 @@
+# mazeindex.py
+from array import array
+
+from maze import WALL_N, WALL_E, WALL_S, WALL_W
+
+
+class MazeIndex:
+    """
+    Instant distance and path queries between any two cells of a perfect maze.
+
+    A perfect maze is a tree, so one BFS from a root cell (the start, unless
+    given) gives every cell a parent and a depth. Each cell also gets a jump
+    pointer to an ancestor further up (skew-binary jump pointers), which is
+    enough to reach any ancestor, and so the lowest common ancestor of two
+    cells, in O(log n) steps. Everything is stored in three flat int
+    arrays, O(n) memory.
+
+    Build one per generated maze, the maze must not change afterwards.
+    """
+    def __init__(self, maze, root=None, parents=None):
+        """
+        root is the cell the tree hangs from, maze.start_cell by default.
+        parents can be a solver.bfs_parents() result from root (like
+        worker.GenerationResult.parents), then the parent links are taken
+        from it as they are and depths and jump pointers are only built when
+        a distance or path query first needs them.
+        """
+        self.maze = maze
+        self.root = maze.index_of(maze.start_cell if root is None else root)
+        self.parent = parents
+        self.depth = None
+        self.jump = None
+        if parents is None:
+            self._build()
+
+    def _build(self):
+        maze = self.maze
+        size = maze.size
+        walls = maze.walls
+        total = size * size
+        root = self.root
+
+        parent = array("i", [-1]) * total
+        depth = array("i", [0]) * total
+        jump = array("i", [0]) * total
+        parent[root] = root
+        jump[root] = root
+
+        # BFS order doubles as the queue, parents always come before children
+        order = [root]
+        for i in order:
+            # Jump pointer shared by all children of i
+            ji = jump[i]
+            if depth[i] - depth[ji] == depth[ji] - depth[jump[ji]]:
+                child_jump = jump[ji]
+            else:
+                child_jump = i
+            child_depth = depth[i] + 1
+
+            w = walls[i]
+            for bit, j in ((WALL_N, i - size), (WALL_E, i + 1), (WALL_S, i + size), (WALL_W, i - 1)):
+                if not w & bit and parent[j] == -1:
+                    parent[j] = i
+                    depth[j] = child_depth
+                    jump[j] = child_jump
+                    order.append(j)
+
+        if len(order) != total:
+            raise ValueError("MazeIndex needs a perfect maze, some cells can't be reached from the root")
+
+        # A tree has one parent per cell for a given root, so this is the
+        # same array as any parents passed in
+        self.parent = parent
+        self.depth = depth
+        self.jump = jump
+
+    def _ancestor(self, i, target_depth):
+        """
+        Ancestor of index i at target_depth (which must be <= depth of i).
+        """
+        depth = self.depth
+        jump = self.jump
+        parent = self.parent
+        while depth[i] > target_depth:
+            j = jump[i]
+            if depth[j] >= target_depth:
+                i = j
+            else:
+                i = parent[i]
+        return i
+
+    def _lca(self, a, b):
+        """
+        Lowest common ancestor of two flat indices.
+        """
+        depth = self.depth
+        if depth[a] > depth[b]:
+            a = self._ancestor(a, depth[b])
+        elif depth[b] > depth[a]:
+            b = self._ancestor(b, depth[a])
+
+        # Same depth means the same jump structure, so both sides move together
+        jump = self.jump
+        parent = self.parent
+        while a != b:
+            if jump[a] != jump[b]:
+                a = jump[a]
+                b = jump[b]
+            else:
+                a = parent[a]
+                b = parent[b]
+        return a
+
+    def distance(self, a, b):
+        """
+        Number of moves on the path between cells a and b.
+        """
+        if self.depth is None:
+            self._build()
+        i = self.maze.index_of(a)
+        j = self.maze.index_of(b)
+        depth = self.depth
+        return depth[i] + depth[j] - 2 * depth[self._lca(i, j)]
+
+    def path(self, a, b):
+        """
+        List of cells from a to b, both included.
+        """
+        if self.depth is None:
+            self._build()
+        i = self.maze.index_of(a)
+        j = self.maze.index_of(b)
+        top = self._lca(i, j)
+        parent = self.parent
+
+        up = []
+        while i != top:
+            up.append(i)
+            i = parent[i]
+        up.append(top)
+
+        down = []
+        while j != top:
+            down.append(j)
+            j = parent[j]
+        down.reverse()
+
+        cell_at = self.maze.cell_at
+        return [cell_at(k) for k in up + down]
+
+    def next_step_toward(self, a, target):
+        """
+        The neighbor of a on the path to target, or None if a is the target.
+        """
+        if self.depth is None:
+            self._build()
+        i = self.maze.index_of(a)
+        t = self.maze.index_of(target)
+        if i == t:
+            return None
+
+        if self._lca(i, t) != i:
+            # Target isn't below us, so the path goes up first
+            step = self.parent[i]
+        else:
+            # Target is below us, step to the child on its branch
+            step = self._ancestor(t, self.depth[i] + 1)
+        return self.maze.cell_at(step)
@@ -0,0 +1,208 @@
+# mazepool.py
+"""
+A pool of ready-made mazes so Generate can respond instantly.
+
+Players tend to click Generate over and over at the same few sizes. The pool
+keeps a few pre-generated, pre-solved mazes for each recently used size and
+tops them up on a background thread whenever the game isn't busy generating
+something else. Memory use is capped, and when it runs out the least
+recently used sizes are dropped first.
+"""
+import threading
+from collections import OrderedDict, deque
+
+from generator import GenerationCancelled
+from solver import solve_with_parents
+from worker import GenerationResult, PROCESS_MIN_SIZE
+
+
+DEFAULT_PER_SIZE = 2
+DEFAULT_MAX_SIZES = 4
+DEFAULT_MEMORY_CAP = 64 * 1024 * 1024
+
+def _result_bytes(result):
+    # Solution and parents are both array("i") (see solver.CellPath)
+    path = result.solution_path.indices
+    parents = result.parents
+    return len(result.maze.walls) + path.itemsize * len(path) + parents.itemsize * len(parents)
+
+
+class MazePool:
+    """
+    Bounded pool of GenerationResults keyed by maze size.
+
+    note_used(size) marks a size as recently used (and worth keeping ready),
+    take(size) hands out a ready maze in O(1) or returns None. Call start()
+    once to begin refilling in the background and stop() on the way out.
+
+    generator is used from the pool's own thread, so it mustn't be shared
+    with anything else that generates (a GenerationWorker, say), or both
+    would draw from one RNG at once.
+    """
+    def __init__(self, generator, per_size=DEFAULT_PER_SIZE, max_sizes=DEFAULT_MAX_SIZES,
+                 memory_cap=DEFAULT_MEMORY_CAP, max_size=PROCESS_MIN_SIZE - 1):
+        self.generator = generator
+        self.per_size = per_size
+        self.max_sizes = max_sizes
+        self.memory_cap = memory_cap
+        self.max_size = max_size
+
+        # size -> deque of ready results, least recently used size first
+        self._ready = OrderedDict()
+        self._bytes = 0
+
+        # Sizes whose last maze didn't fit under the cap, skipped until the
+        # pool changes (a take or a new size)
+        self._blocked = set()
+
+        self._cond = threading.Condition()
+        self._paused = False
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def memory_used(self):
+        return self._bytes
+
+    def ready_count(self, size):
+        with self._cond:
+            entries = self._ready.get(size)
+            return len(entries) if entries is not None else 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def set_paused(self, paused):
+        """
+        Pause refilling (e.g. while the foreground worker is generating).
+        A refill that's already running waits at its next progress check.
+        """
+        with self._cond:
+            if paused != self._paused:
+                self._paused = paused
+                self._cond.notify_all()
+
+    def note_used(self, size):
+        """
+        Mark size as most recently used. Sizes beyond max_sizes fall off the
+        least recently used end, along with their mazes.
+        """
+        if size > self.max_size:
+            return
+
+        with self._cond:
+            self._blocked.clear()
+            if size in self._ready:
+                self._ready.move_to_end(size)
+            else:
+                self._ready[size] = deque()
+                while len(self._ready) > self.max_sizes:
+                    self._drop_size(next(iter(self._ready)))
+            self._cond.notify_all()
+
+    def take(self, size):
+        """
+        A ready GenerationResult for size, or None if there isn't one yet.
+        """
+        with self._cond:
+            entries = self._ready.get(size)
+            if not entries:
+                return None
+            result = entries.popleft()
+            self._bytes -= _result_bytes(result)
+            self._blocked.clear()
+            # There's a free slot now
+            self._cond.notify_all()
+            return result
+
+    def _drop_size(self, size):
+        entries = self._ready.pop(size)
+        for result in entries:
+            self._bytes -= _result_bytes(result)
+
+    def _next_size(self):
+        """
+        Most recently used size that's missing mazes and has room for one
+        more, evicting older sizes' mazes if needed. None if nothing to do.
+        """
+        for size in reversed(self._ready):
+            entries = self._ready[size]
+            if len(entries) >= self.per_size or size in self._blocked:
+                continue
+
+            # Walls alone, the solution isn't known until it's built
+            if self._make_room(size, size * size):
+                return size
+            self._blocked.add(size)
+        return None
+
+    def _make_room(self, size, need):
+        """
+        Evict mazes of sizes used less recently than size, oldest first,
+        until need more bytes fit under the cap. Newer sizes' mazes are never
+        evicted for an older size. Returns False, evicting nothing, if even
+        all the older sizes' mazes wouldn't make enough room.
+        """
+        older = []
+        for other in self._ready:
+            if other == size:
+                break
+            older.append(other)
+
+        short = self._bytes + need - self.memory_cap
+        if short <= 0:
+            return True
+        if sum(_result_bytes(r) for other in older for r in self._ready[other]) < short:
+            return False
+
+        for other in older:
+            other_entries = self._ready[other]
+            while other_entries and self._bytes + need > self.memory_cap:
+                self._bytes -= _result_bytes(other_entries.pop())
+        return True
+
+    def _wait_while_paused(self, done, total):
+        with self._cond:
+            while self._paused and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                raise GenerationCancelled()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (self._paused or self._next_size() is None):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                size = self._next_size()
+
+            try:
+                maze = self.generator.generate(size, progress=self._wait_while_paused)
+            except GenerationCancelled:
+                return
+            path, parents = solve_with_parents(maze, maze.start_cell, maze.finish_cell)
+            result = GenerationResult(size, maze=maze, solution_path=path, parents=parents)
+
+            with self._cond:
+                # The size may have been dropped or filled up meanwhile
+                entries = self._ready.get(size)
+                if entries is None or len(entries) >= self.per_size:
+                    continue
+
+                cost = _result_bytes(result)
+                if self._make_room(size, cost):
+                    entries.append(result)
+                    self._bytes += cost
+                else:
+                    self._blocked.add(size)
@@ -0,0 +1,184 @@
+# minimap.py
+"""
+Whole-maze overview images, for the minimap and the zoomed-out view.
+
+Drawing lines per cell is slow for huge mazes and doesn't show anything at
+a pixel or two per cell anyway. Instead the wall data is rasterized with
+NumPy straight into a pixel array, one pixel per cell, shaded by how many
+passages the cell has (dead ends darkest, junctions lightest). Each mip
+level halves the one before it by averaging 2x2 blocks, down to a few
+pixels.
+
+Only one level is shown at a time. The trail is drawn into its image
+incrementally: a count per pixel of the trail cells it covers, so pushing or
+popping a trail cell touches at most one pixel.
+
+Needs NumPy (pygame.surfarray does too).
+"""
+from array import array
+
+import numpy as np
+import pygame
+import pygame.surfarray
+
+from maze import ALL_WALLS
+
+
+# Gray level by number of open sides (0 to 4)
+OPEN_SHADES = (20, 60, 120, 170, 210)
+
+# Levels with a side bigger than this aren't kept, they'd never be shown
+MAX_LEVEL_PX = 2048
+
+# Shade of each wall byte, through the open side count
+_SHADE_LUT = np.array(
+    [OPEN_SHADES[4 - bin(w & ALL_WALLS).count("1")] for w in range(256)],
+    dtype=np.uint8,
+)
+
+
+def rasterize(maze):
+    """
+    One gray pixel per cell as a (size, size) uint8 array, row major.
+    """
+    cells = np.frombuffer(maze.wall_bytes(), dtype=np.uint8).reshape(maze.size, maze.size)
+    return _SHADE_LUT[cells]
+
+
+def downsample(level):
+    """
+    Half the size (rounded up), each pixel the average of a 2x2 block. Odd
+    sides repeat their last row or column.
+    """
+    h, w = level.shape
+    if h % 2 or w % 2:
+        level = np.pad(level, ((0, h % 2), (0, w % 2)), mode="edge")
+    sums = (
+        level[0::2, 0::2].astype(np.uint16)
+        + level[1::2, 0::2]
+        + level[0::2, 1::2]
+        + level[1::2, 1::2]
+    )
+    return (sums // 4).astype(np.uint8)
+
+
+def build_levels(maze):
+    """
+    Mip levels as (factor, array) pairs, factor being cells per pixel
+    along each side. Levels bigger than MAX_LEVEL_PX are skipped.
+    """
+    level = rasterize(maze)
+    factor = 1
+    levels = []
+    while True:
+        if max(level.shape) <= MAX_LEVEL_PX:
+            levels.append((factor, level))
+        if max(level.shape) == 1:
+            return levels
+        level = downsample(level)
+        factor *= 2
+
+
+class Minimap:
+    """
+    The overview image of one maze, with the trail drawn in.
+
+    sync(maze, trail) keeps it up to date (call it every frame, it only
+    does work for what changed), surface(max_side) returns the image of the
+    biggest level that fits in max_side pixels along with its factor.
+    """
+    TRAIL_COLOR = (200, 60, 60)
+
+    def __init__(self):
+        self.maze = None
+        self.levels = []
+
+        # Level currently drawn into _surface, and its trail counts
+        self._level = None
+        self._surface = None
+        self._counts = None
+
+        # Trail (a player.Trail) as of the last sync, as cell indices
+        self._trail = array("i")
+        self._trail_src = None
+
+    def sync(self, maze, trail):
+        """
+        Catch up with a new maze or the changes to trail since last call.
+        """
+        if maze is not self.maze:
+            self.maze = maze
+            self.levels = build_levels(maze)
+            self._level = None
+            self._trail = array("i")
+            self._trail_src = None
+
+        indices = trail.indices
+        if trail is not self._trail_src:
+            # New trail (Player.reset), start over
+            self._trail = array("i", indices)
+            self._trail_src = trail
+            self._level = None
+            return
+
+        # The trail is a stack, pop what's no longer there, then push the rest
+        drawn = self._trail
+        while drawn and (len(drawn) > len(indices) or drawn[-1] != indices[len(drawn) - 1]):
+            self._add(drawn.pop(), -1)
+        for i in indices[len(drawn):]:
+            drawn.append(i)
+            self._add(i, 1)
+
+    def level_for(self, max_side):
+        """
+        Index of the biggest level no wider or taller than max_side pixels
+        (the smallest level if none fits).
+        """
+        for k, (_, level) in enumerate(self.levels):
+            if max(level.shape) <= max_side:
+                return k
+        return len(self.levels) - 1
+
+    def surface(self, max_side):
+        """
+        Returns (surface, factor) for the biggest level that fits max_side.
+        Switching level redraws the trail into it, otherwise it's reused.
+        """
+        k = self.level_for(max_side)
+        if k != self._level:
+            self._use_level(k)
+        return self._surface, self.levels[k][0]
+
+    def _use_level(self, k):
+        factor, level = self.levels[k]
+        counts = np.zeros(level.shape, dtype=np.int32)
+        if self._trail:
+            trail = np.frombuffer(self._trail, dtype=np.int32).astype(np.int64)
+            size = self.maze.size
+            np.add.at(counts, (trail // size // factor, trail % size // factor), 1)
+
+        rgb = np.repeat(level[:, :, None], 3, axis=2)
+        rgb[counts > 0] = self.TRAIL_COLOR
+        # surfarray is indexed [x, y]
+        self._surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+        self._counts = counts
+        self._level = k
+
+    def _add(self, index, delta):
+        """
+        Count a trail cell in or out of the current level's image.
+        """
+        if self._level is None:
+            return
+        factor, level = self.levels[self._level]
+        r, c = divmod(index, self.maze.size)
+        r //= factor
+        c //= factor
+
+        before = self._counts[r, c]
+        self._counts[r, c] = before + delta
+        if before == 0:
+            self._surface.set_at((c, r), self.TRAIL_COLOR)
+        elif before + delta == 0:
+            shade = int(level[r, c])
+            self._surface.set_at((c, r), (shade, shade, shade))
@@ -1,22 +1,106 @@
 # player.py
+from array import array
+
+
+class Trail:
+    """
+    The cells the player has walked, as a stack of flat cell indices.
+
+    Alongside the index array it keeps a bitmap (one bit per cell) for O(1)
+    "is this cell on the trail" checks, and each cell's position on the
+    trail for O(1) distance_back(). Nothing is kept per cell beyond the bit,
+    the rest only grows with the trail itself.
+
+    A cell can only be on the trail once. Reads like a list of cells
+    (len, iteration, indexing, in), so code that used the old list works.
+    """
+    __slots__ = ("maze", "indices", "_bits", "_pos")
+
+    def __init__(self, maze=None):
+        self.maze = maze
+        self.indices = array("i")
+        cells = maze.size * maze.size if maze is not None else 0
+        self._bits = bytearray((cells + 7) >> 3)
+        self._pos = {}
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        cell_at = self.maze.cell_at if self.maze is not None else None
+        for i in self.indices:
+            yield cell_at(i)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.maze.cell_at(j) for j in self.indices[i]]
+        return self.maze.cell_at(self.indices[i])
+
+    def __contains__(self, cell):
+        if self.maze is None or cell.maze is not self.maze:
+            return False
+        return self.contains_index(cell.row * self.maze.size + cell.col)
+
+    def contains_index(self, index):
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def append(self, cell):
+        index = cell.row * self.maze.size + cell.col
+        if self.contains_index(index):
+            raise ValueError(f"Cell ({cell.row}, {cell.col}) is already on the trail")
+        self._pos[index] = len(self.indices)
+        self.indices.append(index)
+        self._bits[index >> 3] |= 1 << (index & 7)
+
+    def pop(self):
+        index = self.indices.pop()
+        del self._pos[index]
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        return self.maze.cell_at(index)
+
+    def position(self, cell):
+        """
+        Where cell is on the trail (0 = first), or None if it isn't on it.
+        """
+        if cell not in self:
+            return None
+        return self._pos[cell.row * self.maze.size + cell.col]
+
+    def distance_back(self, cell):
+        """
+        Steps back along the trail from its end to cell, or None if cell
+        isn't on the trail.
+        """
+        pos = self.position(cell)
+        if pos is None:
+            return None
+        return len(self.indices) - 1 - pos
+
+
 class Player:
     """
     Tracks current position and a trail that disappears when backtracking.
     """
     def __init__(self):
         self.current_cell = None
-        self.trail = []  # list of cells, in order
+        self.trail = Trail()  # cells, in order
+
+        # Cells whose look changed since the renderer last asked
+        self.dirty_cells = []
 
     def reset(self, start_cell):
         self.current_cell = start_cell
-        self.trail = [start_cell]
+        self.trail = Trail(start_cell.maze)
+        self.trail.append(start_cell)
+        self.dirty_cells = [start_cell]
 
     def try_move(self, direction, maze):
         """
         Attempt to move in a direction.
         - If blocked by a wall or edge: do nothing, return False
         - If move succeeds:
-            - If new cell is the previous trail cell, pop (backtrack)
+            - If new cell is already on the trail, pop back to it
+              (backtrack, in a perfect maze it's always the previous cell)
             - Otherwise append (forward move)
         """
         if self.current_cell is None:
@@ -30,13 +114,26 @@ class Player:
             return False
 
         # Backtracking behavior
-        if len(self.trail) >= 2 and nxt == self.trail[-2]:
-            # Move back one step, remove last cell from trail
-            self.trail.pop()
+        if nxt in self.trail:
+            # Move back, remove the cells after nxt from the trail
+            for _ in range(self.trail.distance_back(nxt)):
+                self.dirty_cells.append(self.trail.pop())
+            self.dirty_cells.append(nxt)
             self.current_cell = nxt
             return True
 
         # Forward move
+        self.dirty_cells.append(self.current_cell)
+        self.dirty_cells.append(nxt)
         self.current_cell = nxt
         self.trail.append(nxt)
         return True
+
+    def consume_dirty_cells(self):
+        """
+        Cells that need redrawing since the last call (old cell, new cell,
+        popped trail cell). Clears the list.
+        """
+        out = self.dirty_cells
+        self.dirty_cells = []
+        return out
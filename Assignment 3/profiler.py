@@ -0,0 +1,215 @@
+# profiler.py
+"""
+Frame profiler for main's loop.
+
+Each frame is split into phases with mark(): the time since the previous
+mark (or the start of the frame) is added to the named phase. main marks
+its own steps (events, moves, generation, present) and the Renderer marks
+its drawing steps (fill, ui, overlay, walls, player...).
+
+When it's off, begin_frame() returns None and main hands the Renderer None
+too, so the only cost left is checking for None.
+
+While on, every frame is kept for the trace, which is written out as CSV or
+JSON (by the file extension) when the profiler is turned off or the game
+exits. Generation jobs are logged alongside, with their generate and solve
+times.
+"""
+import csv
+import json
+import math
+import time
+from collections import deque
+
+
+# Frames the overlay's numbers cover
+WINDOW = 300
+
+# Seconds between overlay text updates
+OVERLAY_REFRESH = 0.25
+
+DEFAULT_TRACE_PATH = "frame_trace.csv"
+
+
+def percentile(sorted_values, p):
+    """
+    The p-th percentile (0-100) of an already sorted sequence, nearest
+    rank: the smallest value with at least p% of the values at or below
+    it. 0.0 for an empty one.
+    """
+    if not sorted_values:
+        return 0.0
+    n = len(sorted_values)
+    k = min(n - 1, max(0, math.ceil(p / 100 * n) - 1))
+    return sorted_values[k]
+
+
+class FrameProfiler:
+    """
+    Per-phase frame timings, a live overlay and a trace dump.
+    """
+    def __init__(self, trace_path=DEFAULT_TRACE_PATH):
+        self.enabled = False
+        self.trace_path = trace_path
+
+        # Full trace since it was turned on
+        self.frames = []
+        self.jobs = []
+
+        self._recent = deque(maxlen=WINDOW)
+        self._frame = None
+        self._start = 0.0
+        self._last = 0.0
+
+        self._font = None
+        self._surface = None
+        self._surface_time = 0.0
+
+    def set_enabled(self, on):
+        """
+        Turn profiling on or off. Turning it off writes the trace, returns
+        where to (None if nothing was written).
+        """
+        if on == self.enabled:
+            return None
+        path = None
+        if not on:
+            path = self.dump()
+        self.enabled = on
+        self.frames = []
+        self.jobs = []
+        self._recent.clear()
+        self._frame = None
+        self._surface = None
+        return path
+
+    def toggle(self):
+        return self.set_enabled(not self.enabled)
+
+    def begin_frame(self, dt_ms):
+        """
+        Start timing a frame. dt_ms is what clock.tick() returned. Returns
+        the profiler, or None when it's off.
+        """
+        if not self.enabled:
+            return None
+        now = time.perf_counter()
+        self._frame = {"dt": dt_ms, "phases": {}}
+        self._start = self._last = now
+        return self
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        phases = self._frame["phases"]
+        phases[phase] = phases.get(phase, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self):
+        frame = self._frame
+        frame["work"] = (time.perf_counter() - self._start) * 1000
+        self.frames.append(frame)
+        self._recent.append(frame)
+        self._frame = None
+
+    def job(self, name, size, ms):
+        """
+        Log work done outside the frame loop (generating, solving).
+        """
+        if self.enabled:
+            self.jobs.append({"name": name, "size": size, "ms": ms, "frame": len(self.frames)})
+
+    def stats(self):
+        """
+        Numbers for the last WINDOW frames: work and dt percentiles (ms) and
+        the average ms per phase.
+        """
+        recent = list(self._recent)
+        work = sorted(f["work"] for f in recent)
+        dt = sorted(f["dt"] for f in recent)
+        phases = {}
+        for f in recent:
+            for name, ms in f["phases"].items():
+                phases[name] = phases.get(name, 0.0) + ms
+        n = len(recent) or 1
+        return {
+            "frames": len(recent),
+            "work": {p: percentile(work, p) for p in (50, 95, 99, 100)},
+            "dt": {p: percentile(dt, p) for p in (50, 95, 99, 100)},
+            "phases": {name: total / n for name, total in phases.items()},
+        }
+
+    def draw(self, screen, x, y):
+        """
+        Blit the overlay with its top right corner at x, y. Returns its rect.
+        The text is redrawn a few times a second, not every frame.
+        """
+        now = time.perf_counter()
+        if self._surface is None or now - self._surface_time >= OVERLAY_REFRESH:
+            self._surface = self._build_overlay()
+            self._surface_time = now
+
+        rect = self._surface.get_rect(topright=(x, y))
+        screen.blit(self._surface, rect)
+        return rect
+
+    def _build_overlay(self):
+        # Only the overlay needs pygame, so headless tools (loadgen.py) can
+        # use percentile() without it
+        import pygame
+
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 20)
+        font = self._font
+        s = self.stats()
+
+        work = s["work"]
+        dt = s["dt"]
+        fps = 1000 / dt[50] if dt[50] else 0.0
+        lines = [
+            f"PROFILER (F3)  {s['frames']} frames",
+            f"work ms p50 {work[50]:.2f} p95 {work[95]:.2f} p99 {work[99]:.2f} max {work[100]:.2f}",
+            f"dt ms   p50 {dt[50]:.1f} p95 {dt[95]:.1f} p99 {dt[99]:.1f} ({fps:.0f} fps)",
+        ]
+        for name, ms in sorted(s["phases"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<10} {ms:7.3f} ms")
+        for job in self.jobs[-2:]:
+            lines.append(f"{job['name']} {job['size']}x{job['size']}: {job['ms']:.0f} ms")
+
+        rendered = [font.render(line, True, (230, 230, 230)) for line in lines]
+        w = max(r.get_width() for r in rendered) + 12
+        h = sum(r.get_height() for r in rendered) + 10
+        surface = pygame.Surface((w, h))
+        surface.fill((0, 0, 0))
+        pygame.draw.rect(surface, (90, 90, 90), surface.get_rect(), 1)
+        ty = 5
+        for r in rendered:
+            surface.blit(r, (6, ty))
+            ty += r.get_height()
+        return surface
+
+    def dump(self, path=None):
+        """
+        Write the trace to path (default trace_path): CSV with one row per
+        frame, or JSON with the frames and jobs if path ends in .json.
+        Returns the path, or None if there was nothing to write.
+        """
+        path = path or self.trace_path
+        if not self.frames or not path:
+            return None
+
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"frames": self.frames, "jobs": self.jobs}, f)
+            return path
+
+        names = sorted({name for f in self.frames for name in f["phases"]})
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "dt_ms", "work_ms"] + names)
+            for i, frame in enumerate(self.frames):
+                phases = frame["phases"]
+                writer.writerow(
+                    [i, frame["dt"], f"{frame['work']:.4f}"]
+                    + [f"{phases.get(name, 0.0):.4f}" for name in names]
+                )
+        return path
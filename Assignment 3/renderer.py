@@ -1,6 +1,17 @@
 # renderer.py
+from array import array
+from collections import OrderedDict
+
 import pygame
 
+from maze import WALL_N, WALL_E, WALL_S, WALL_W
+
+try:
+    from minimap import Minimap
+except ImportError:
+    # No NumPy, so no minimap or overview
+    Minimap = None
+
 
 class Renderer:
     """
@@ -11,8 +22,47 @@ class Renderer:
     - Player (blue)
     - Finish cell (green outline)
     - Optional solution overlay (yellow)
+    - Optional hint route from the player to the finish (cyan dots)
+
+    Mazes too big to fit the window at a readable cell size (or zoomed in)
+    are drawn through a camera that follows the player, from cached tiles,
+    with a minimap of the whole maze in the corner. Zooming out past the
+    smallest cell size shows the whole maze as an overview image instead.
     """
-    def __init__(self, window_w, window_h, ui_bar_h):
+    # Walls are drawn 2px wide and can stick out past the grid a little,
+    # the cached wall layer gets this much spare room on every side
+    WALL_MARGIN = 2
+
+    # Color the cached layers are cleared to, it's treated as transparent
+    LAYER_KEY = (255, 0, 255)
+
+    TRAIL_COLOR = (120, 40, 40)
+    SOLUTION_COLOR = (180, 180, 60)
+    HINT_COLOR = (80, 200, 220)
+
+    # Zoom steps (cell size in pixels) for zoom_in()/zoom_out()
+    ZOOM_LEVELS = (4, 6, 8, 12, 16, 24, 32, 48, 64)
+
+    # Fitting the maze to the window is only done while cells stay at least
+    # this big, past that the camera takes over at CAMERA_CELL pixels
+    MIN_FIT_CELL = 4
+    CAMERA_CELL = 16
+
+    # When the maze is bigger than the window it's cached as tiles of about
+    # TILE_PX pixels square instead of one huge layer, least recently used
+    # tiles are dropped past TILE_CACHE_SIZE. One tile next to the view is
+    # built ahead of time per render_dirty() call, so scrolling finds it ready.
+    TILE_PX = 256
+    TILE_CACHE_SIZE = 96
+
+    # Rendered text surfaces kept (least recently used dropped first)
+    TEXT_CACHE_SIZE = 64
+
+    # Biggest minimap side in pixels, and its distance from the window edge
+    MINIMAP_PX = 180
+    MINIMAP_MARGIN = 10
+
+    def __init__(self, window_w, window_h, ui_bar_h, cache_layers=True):
         self.window_w = window_w
         self.window_h = window_h
         self.ui_bar_h = ui_bar_h
@@ -21,42 +71,229 @@ class Renderer:
         self.font = pygame.font.SysFont(None, 24)
         self.big_font = pygame.font.SysFont(None, 42)
 
-    def render(self, screen, maze, player, ui, game_state, solution_path):
+        # (font, text, color) -> rendered text surface
+        self._text_cache = OrderedDict()
+
+        # The UI bar drawn once per UI state, all but the blinking cursor
+        self._ui_bar = None
+        self._ui_bar_key = None
+        self._ui_cursor_x = 0
+
+        # Walls never change after generation, so they're drawn once into an
+        # offscreen surface and blitted every frame. The trail and solution
+        # overlay share a second surface that's only touched where the trail
+        # changed. Set False to draw everything every frame instead (only
+        # useful for comparing).
+        self.cache_layers = cache_layers
+        self._wall_layer = None
+        self._wall_layer_maze = None
+        self._wall_layer_key = None
+
+        self._overlay_layer = None
+        self._overlay_maze = None
+        self._overlay_key = None
+        self._overlay_solution = None
+        # Cell indices: solution cells, and the trail as currently drawn into
+        # the overlay plus the Player.trail it mirrors
+        self._solution_cells = set()
+        self._drawn_trail = array("i")
+        self._drawn_trail_src = None
+        # Same for the hint route (a hint.HintRoute, None when it's off)
+        self._drawn_hint = array("i")
+        self._drawn_hint_src = None
+
+        # Camera mode: the view follows the player and only the tiles it
+        # overlaps are drawn. (row, col) -> [wall surface, overlay surface],
+        # an overlay of None gets redrawn the next time the tile is used.
+        self.zoom = None
+        self._camera = (0, 0)
+        self._camera_maze = None
+        self._camera_cell = None
+        self._tiles = OrderedDict()
+        self._tiles_maze = None
+        self._tiles_cell = None
+
+        # Minimap and overview images (None without NumPy), and where the
+        # minimap was last drawn (None if it wasn't)
+        self.minimap = Minimap() if Minimap is not None else None
+        self.overview = False
+        self._minimap_rect = None
+
+        # A profiler.FrameProfiler to mark render phases with, set by main
+        # for frames that are being profiled and None otherwise
+        self.profiler = None
+
+        # What the screen showed after the last render_dirty() call
+        self._needs_full_redraw = True
+        self._last_maze = None
+        self._last_state = None
+        self._last_show_solution = False
+        self._last_hint = None
+        self._last_cursor_on = False
+
+    def set_window_size(self, window_w, window_h):
+        if (window_w, window_h) != (self.window_w, self.window_h):
+            self.window_w = window_w
+            self.window_h = window_h
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop the cached layers so the next frame redraws them (and the next
+        render_dirty() call redraws the whole window).
+        A new maze or cell size is picked up automatically.
+        """
+        self._wall_layer = None
+        self._wall_layer_maze = None
+        self._wall_layer_key = None
+        self._overlay_layer = None
+        self._overlay_maze = None
+        self._drawn_trail_src = None
+        self._tiles.clear()
+        self._tiles_maze = None
+        self._camera_maze = None
+        self._needs_full_redraw = True
+
+    def set_zoom(self, cell_size):
+        """
+        Cell size in pixels, or None to fit the maze to the window (or use
+        the camera at CAMERA_CELL if fitting would make cells too small).
+        """
+        if cell_size != self.zoom or self.overview:
+            self.zoom = cell_size
+            self.overview = False
+            self.invalidate()
+
+    def set_overview(self, on):
+        """
+        Show the whole maze as one overview image (needs NumPy).
+        """
+        on = on and self.minimap is not None
+        if on != self.overview:
+            self.overview = on
+            self.invalidate()
+
+    def zoom_in(self, maze):
+        if self.overview:
+            self.set_zoom(self.ZOOM_LEVELS[0])
+            return
+        current = self._cell_size(maze)
+        for z in self.ZOOM_LEVELS:
+            if z > current:
+                self.set_zoom(z)
+                return
+
+    def zoom_out(self, maze):
+        current = self._cell_size(maze)
+        for z in reversed(self.ZOOM_LEVELS):
+            if z < current:
+                self.set_zoom(z)
+                return
+        # Past the smallest cell size
+        self.set_overview(True)
+
+    def render(self, screen, maze, player, ui, game_state, solution_path, hint=None):
+        prof = self.profiler
         screen.fill((18, 18, 18))
+        if prof is not None:
+            prof.mark("fill")
+
+        # UI bar, skipped when clipped to a region below it
+        ui_bar = pygame.Rect(0, 0, self.window_w, self.ui_bar_h)
+        if screen.get_clip().colliderect(ui_bar):
+            if self.cache_layers:
+                screen.blit(self._get_ui_bar(screen, ui), ui_bar)
+            else:
+                # UI bar background
+                pygame.draw.rect(screen, (30, 30, 30), ui_bar)
 
-        # UI bar background
-        pygame.draw.rect(screen, (30, 30, 30), (0, 0, self.window_w, self.ui_bar_h))
+                # Draw UI elements
+                self._ui_cursor_x = self._draw_ui(screen, ui)
 
-        # Draw UI elements
-        self._draw_ui(screen, ui)
+            # Blinking cursor when active, the only part that changes by itself
+            if ui.active_input and (pygame.time.get_ticks() // 500) % 2 == 0:
+                cursor_y0 = ui.input_rect.y + 8
+                cursor_y1 = ui.input_rect.y + ui.input_rect.h - 8
+                x = self._ui_cursor_x
+                pygame.draw.line(screen, (240, 240, 240), (x, cursor_y0), (x, cursor_y1), 2)
+        if prof is not None:
+            prof.mark("ui")
 
         if maze is None:
             return
 
-        # Compute cell size to fit below UI bar
-        grid_w = self.window_w
-        grid_h = self.window_h - self.ui_bar_h
+        # Keep the maze out of the UI bar when the camera has scrolled it up
+        clip = screen.get_clip()
+        screen.set_clip(clip.clip(self._grid_rect()))
+        if self.overview:
+            self._draw_overview(screen, maze, player)
+            if prof is not None:
+                prof.mark("overview")
+        else:
+            self._draw_maze(screen, maze, player, solution_path, hint)
+        screen.set_clip(clip)
 
-        cell_size = min(grid_w // maze.size, grid_h // maze.size)
-        if cell_size < 2:
-            cell_size = 2
+        # Win overlay
+        if game_state == "WON":
+            self._draw_win(screen)
+            if prof is not None:
+                prof.mark("win")
 
-        offset_x = (grid_w - cell_size * maze.size) // 2
-        offset_y = self.ui_bar_h + (grid_h - cell_size * maze.size) // 2
+    def _draw_maze(self, screen, maze, player, solution_path, hint=None):
+        """
+        The maze at the current zoom, through the camera if it scrolls.
+        """
+        prof = self.profiler
+        self._update_camera(maze, player)
+        cell_size, offset_x, offset_y = self._layout(maze)
+        scrolls = self._scrolls(maze, cell_size)
+        tiled = self.cache_layers and scrolls
 
-        # Trail fill (light red)
-        if player.current_cell is not None:
-            for c in player.trail:
-                x = offset_x + c.col * cell_size
-                y = offset_y + c.row * cell_size
-                pygame.draw.rect(screen, (120, 40, 40), (x, y, cell_size, cell_size))
-
-        # Optional solution overlay (highlights with yellow squares)
-        if solution_path:
-            for c in solution_path:
-                x = offset_x + c.col * cell_size
-                y = offset_y + c.row * cell_size
-                pygame.draw.rect(screen, (180, 180, 60), (x + 2, y + 2, cell_size - 4, cell_size - 4), 2)
+        r0, r1, c0, c1 = self._visible_cells(screen.get_clip(), maze, cell_size, offset_x, offset_y)
+
+        if tiled:
+            self._sync_tiles(maze, cell_size, player, solution_path, hint)
+            tiles = self._visible_tiles(cell_size, r0, r1, c0, c1)
+            for tr, tc in tiles:
+                tile = self._get_tile(screen, maze, cell_size, tr, tc)
+                x, y = self._tile_origin(cell_size, tr, tc, offset_x, offset_y)
+                screen.blit(tile[1], (x, y))
+        elif self.cache_layers:
+            # Trail, solution and hint overlay in one blit
+            layer = self._get_overlay_layer(screen, maze, cell_size, player, solution_path, hint)
+            screen.blit(layer, (offset_x, offset_y))
+        else:
+            # Trail fill (light red)
+            if player.current_cell is not None:
+                for c in player.trail:
+                    if not (r0 <= c.row < r1 and c0 <= c.col < c1):
+                        continue
+                    x = offset_x + c.col * cell_size
+                    y = offset_y + c.row * cell_size
+                    pygame.draw.rect(screen, self.TRAIL_COLOR, (x, y, cell_size, cell_size))
+            if prof is not None:
+                prof.mark("trail")
+
+            # Optional solution overlay (highlights with yellow squares)
+            if solution_path:
+                for c in solution_path:
+                    if not (r0 <= c.row < r1 and c0 <= c.col < c1):
+                        continue
+                    x = offset_x + c.col * cell_size
+                    y = offset_y + c.row * cell_size
+                    pygame.draw.rect(screen, self.SOLUTION_COLOR, (x + 2, y + 2, cell_size - 4, cell_size - 4), 2)
+
+            # Optional hint route (cyan dots)
+            if hint is not None:
+                for i in hint.indices:
+                    r, c = divmod(i, maze.size)
+                    if not (r0 <= r < r1 and c0 <= c < c1):
+                        continue
+                    x = offset_x + c * cell_size
+                    y = offset_y + r * cell_size
+                    self._draw_hint_dot(screen, x, y, cell_size)
+        if prof is not None:
+            prof.mark("overlay")
 
         # Finish cell outline
         f = maze.finish_cell
@@ -65,21 +302,18 @@ class Renderer:
         pygame.draw.rect(screen, (60, 180, 80), (fx, fy, cell_size, cell_size), 3)
 
         # Maze walls
-        wall_color = (230, 230, 230)
-        for r in range(maze.size):
-            for c in range(maze.size):
-                cell = maze.cells[r][c]
-                x = offset_x + c * cell_size
-                y = offset_y + r * cell_size
-
-                if cell.wall_n:
-                    pygame.draw.line(screen, wall_color, (x, y), (x + cell_size, y), 2)
-                if cell.wall_e:
-                    pygame.draw.line(screen, wall_color, (x + cell_size, y), (x + cell_size, y + cell_size), 2)
-                if cell.wall_s:
-                    pygame.draw.line(screen, wall_color, (x, y + cell_size), (x + cell_size, y + cell_size), 2)
-                if cell.wall_w:
-                    pygame.draw.line(screen, wall_color, (x, y), (x, y + cell_size), 2)
+        m = self.WALL_MARGIN
+        if tiled:
+            for tr, tc in tiles:
+                x, y = self._tile_origin(cell_size, tr, tc, offset_x, offset_y)
+                screen.blit(self._tiles[(tr, tc)][0], (x - m, y - m))
+        elif self.cache_layers:
+            layer = self._get_wall_layer(screen, maze, cell_size)
+            screen.blit(layer, (offset_x - m, offset_y - m))
+        else:
+            self._draw_walls(screen, maze, cell_size, offset_x, offset_y, (r0, r1), (c0, c1))
+        if prof is not None:
+            prof.mark("walls")
 
         # Player dot (blue)
         if player.current_cell is not None:
@@ -88,12 +322,539 @@ class Renderer:
             cy = offset_y + pc.row * cell_size + cell_size // 2
             radius = max(3, cell_size // 3)
             pygame.draw.circle(screen, (60, 120, 255), (cx, cy), radius)
+        if prof is not None:
+            prof.mark("player")
 
-        # Win overlay
-        if game_state == "WON":
-            self._draw_win(screen)
+        self._minimap_rect = None
+        if scrolls and self.minimap is not None:
+            self._draw_minimap(screen, maze, player, cell_size, offset_x, offset_y)
+            if prof is not None:
+                prof.mark("minimap")
+
+    def _minimap_image(self, maze, player, max_side):
+        self.minimap.sync(maze, player.trail)
+        return self.minimap.surface(max_side)
+
+    def _draw_minimap(self, screen, maze, player, cell_size, offset_x, offset_y):
+        """
+        Whole-maze minimap in the bottom right corner, with the part the
+        main view shows outlined.
+        """
+        image, factor = self._minimap_image(maze, player, self.MINIMAP_PX)
+        w, h = image.get_size()
+        grid = self._grid_rect()
+        m = self.MINIMAP_MARGIN
+        rect = pygame.Rect(grid.right - w - m, grid.bottom - h - m, w, h)
+
+        frame = rect.inflate(4, 4)
+        pygame.draw.rect(screen, (90, 90, 90), frame, 2)
+        screen.blit(image, rect)
+
+        # Main view, in minimap pixels
+        px = cell_size * factor
+        view = pygame.Rect(
+            rect.x + (grid.x - offset_x) // px,
+            rect.y + (grid.y - offset_y) // px,
+            max(1, grid.w // px),
+            max(1, grid.h // px),
+        ).clip(rect)
+        pygame.draw.rect(screen, (240, 240, 240), view, 1)
+
+        self._draw_markers(screen, maze, player, rect.x, rect.y, factor, 1)
+        self._minimap_rect = frame
+
+    def _draw_overview(self, screen, maze, player):
+        """
+        Zoomed all the way out: the mip level that fits the window, scaled
+        up by a whole factor if it's small.
+        """
+        grid = self._grid_rect()
+        image, factor = self._minimap_image(maze, player, min(grid.w, grid.h))
+        w, h = image.get_size()
+        scale = max(1, min(grid.w // w, grid.h // h))
+        if scale > 1:
+            image = pygame.transform.scale(image, (w * scale, h * scale))
+
+        x = grid.x + (grid.w - w * scale) // 2
+        y = grid.y + (grid.h - h * scale) // 2
+        screen.blit(image, (x, y))
+        self._draw_markers(screen, maze, player, x, y, factor, scale)
+
+    def _draw_markers(self, screen, maze, player, x, y, factor, scale):
+        """
+        Finish and player positions on a minimap/overview image drawn at x, y.
+        """
+        side = max(5, scale)
+        marks = [(maze.finish_cell, (60, 180, 80))]
+        if player.current_cell is not None:
+            marks.append((player.current_cell, (60, 120, 255)))
+        for cell, color in marks:
+            cx = x + (cell.col // factor) * scale + scale // 2
+            cy = y + (cell.row // factor) * scale + scale // 2
+            pygame.draw.rect(screen, color, (cx - side // 2, cy - side // 2, side, side))
+
+    def render_dirty(self, screen, maze, player, ui, game_state, solution_path, dirty_cells, ui_dirty, full=False, hint=None):
+        """
+        Incremental mode. Redraws only the regions that changed and returns
+        them as a list of rects for pygame.display.update(), or [] if nothing
+        changed (nothing is drawn then).
+
+        dirty_cells comes from Player.consume_dirty_cells() (plus
+        HintRoute.consume_dirty_cells() with a hint) and ui_dirty from
+        UIControls.consume_dirty(). A new maze, a game state change or the
+        solution or hint overlay toggling redraws the whole window, as does
+        full=True.
+        """
+        show_solution = bool(solution_path)
+        cursor_on = ui.active_input and (pygame.time.get_ticks() // 500) % 2 == 0
+
+        # A scrolled view means every pixel of the grid moved
+        scrolled = maze is not None and self._update_camera(maze, player)
+
+        if (
+            full
+            or scrolled
+            or self._needs_full_redraw
+            or maze is not self._last_maze
+            or game_state != self._last_state
+            or show_solution != self._last_show_solution
+            or hint is not self._last_hint
+        ):
+            self._needs_full_redraw = False
+            self._last_maze = maze
+            self._last_state = game_state
+            self._last_show_solution = show_solution
+            self._last_hint = hint
+            self._last_cursor_on = cursor_on
+            self.render(screen, maze, player, ui, game_state, solution_path, hint)
+            self._prefetch_tile(screen, maze)
+            return [screen.get_rect()]
+
+        rects = []
+
+        # The blinking cursor is the only UI change that isn't an input event
+        if ui_dirty or cursor_on != self._last_cursor_on:
+            self._last_cursor_on = cursor_on
+            rects.append(pygame.Rect(0, 0, self.window_w, self.ui_bar_h))
+
+        if maze is not None and dirty_cells:
+            if self.overview:
+                rects.append(self._grid_rect())
+            else:
+                cell_rects = [self._cell_rect(maze, c) for c in dirty_cells]
+                rects.append(cell_rects[0].unionall(cell_rects[1:]))
+                # The minimap shows the trail and the player too
+                if self._minimap_rect is not None:
+                    rects.append(self._minimap_rect)
+
+        for rect in rects:
+            screen.set_clip(rect)
+            self.render(screen, maze, player, ui, game_state, solution_path, hint)
+        screen.set_clip(None)
+
+        if maze is not None:
+            self._prefetch_tile(screen, maze)
+        return rects
+
+    def _grid_rect(self):
+        return pygame.Rect(0, self.ui_bar_h, self.window_w, self.window_h - self.ui_bar_h)
+
+    def _cell_size(self, maze):
+        if self.zoom is not None:
+            return self.zoom
+
+        grid_w = self.window_w
+        grid_h = self.window_h - self.ui_bar_h
+        cell_size = min(grid_w // maze.size, grid_h // maze.size)
+        if cell_size < self.MIN_FIT_CELL:
+            cell_size = self.CAMERA_CELL
+        return cell_size
+
+    def _scrolls(self, maze, cell_size):
+        """
+        True if the maze doesn't fit below the UI bar at this cell size.
+        """
+        span = cell_size * maze.size
+        return span > self.window_w or span > self.window_h - self.ui_bar_h
+
+    def _layout(self, maze):
+        """
+        Returns (cell_size, offset_x, offset_y), where the maze's top left
+        corner goes on screen. Centered below the UI bar along each axis it
+        fits in, otherwise placed by the camera (so the offset can be
+        negative).
+        """
+        grid_w = self.window_w
+        grid_h = self.window_h - self.ui_bar_h
+
+        cell_size = self._cell_size(maze)
+        span = cell_size * maze.size
+        cam_x, cam_y = self._camera
+
+        offset_x = (grid_w - span) // 2 if span <= grid_w else -cam_x
+        offset_y = self.ui_bar_h + ((grid_h - span) // 2 if span <= grid_h else -cam_y)
+        return cell_size, offset_x, offset_y
+
+    def _update_camera(self, maze, player):
+        """
+        Scroll the view (in maze pixels) so the player stays in the middle
+        half of the window. A new maze or zoom starts centered on the player.
+        Returns True if the view moved.
+        """
+        cell_size = self._cell_size(maze)
+        span = cell_size * maze.size
+        recenter = maze is not self._camera_maze or cell_size != self._camera_cell
+
+        pc = player.current_cell if player.current_cell is not None else maze.start_cell
+        px = pc.col * cell_size + cell_size // 2
+        py = pc.row * cell_size + cell_size // 2
+
+        def follow(cam, p, view):
+            if recenter or not (cam + view // 4 <= p < cam + view - view // 4):
+                cam = p - view // 2
+            return max(0, min(cam, span - view))
+
+        camera = (
+            follow(self._camera[0], px, self.window_w),
+            follow(self._camera[1], py, self.window_h - self.ui_bar_h),
+        )
+        moved = camera != self._camera and not recenter
+        self._camera = camera
+        self._camera_maze = maze
+        self._camera_cell = cell_size
+        return moved
+
+    def _visible_cells(self, view, maze, cell_size, offset_x, offset_y):
+        """
+        (r0, r1, c0, c1), the rows and columns whose cells or walls can
+        show inside the view rect.
+        """
+        m = self.WALL_MARGIN
+        c0 = max(0, (view.left - offset_x - m) // cell_size)
+        c1 = min(maze.size, (view.right - offset_x + m) // cell_size + 1)
+        r0 = max(0, (view.top - offset_y - m) // cell_size)
+        r1 = min(maze.size, (view.bottom - offset_y + m) // cell_size + 1)
+        if view.w == 0 or view.h == 0:
+            return 0, 0, 0, 0
+        return r0, max(r0, r1), c0, max(c0, c1)
+
+    def _cell_rect(self, maze, cell):
+        """
+        Screen area a cell can touch, including its walls and the player dot.
+        """
+        cell_size, offset_x, offset_y = self._layout(maze)
+        radius = max(3, cell_size // 3)
+        pad = max(self.WALL_MARGIN, radius - cell_size // 2 + 1)
+        rect = pygame.Rect(offset_x + cell.col * cell_size, offset_y + cell.row * cell_size, cell_size, cell_size)
+        return rect.inflate(2 * pad, 2 * pad)
+
+    def _tile_cells(self, cell_size):
+        return max(1, self.TILE_PX // cell_size)
+
+    def _visible_tiles(self, cell_size, r0, r1, c0, c1):
+        if r0 >= r1 or c0 >= c1:
+            return []
+        n = self._tile_cells(cell_size)
+        return [
+            (tr, tc)
+            for tr in range(r0 // n, (r1 - 1) // n + 1)
+            for tc in range(c0 // n, (c1 - 1) // n + 1)
+        ]
+
+    def _tile_origin(self, cell_size, tr, tc, offset_x, offset_y):
+        span = self._tile_cells(cell_size) * cell_size
+        return offset_x + tc * span, offset_y + tr * span
+
+    def _tile_bounds(self, maze, cell_size, tr, tc):
+        n = self._tile_cells(cell_size)
+        return tr * n, min(maze.size, (tr + 1) * n), tc * n, min(maze.size, (tc + 1) * n)
+
+    def _get_tile(self, screen, maze, cell_size, tr, tc):
+        """
+        The [walls, overlay] surfaces for one tile, drawing whichever is
+        missing. Tiles are kept in least recently used order.
+        """
+        key = (tr, tc)
+        tile = self._tiles.get(key)
+        r0, r1, c0, c1 = self._tile_bounds(maze, cell_size, tr, tc)
+        w = (c1 - c0) * cell_size
+        h = (r1 - r0) * cell_size
+
+        if tile is None:
+            m = self.WALL_MARGIN
+            walls = pygame.Surface((w + 2 * m, h + 2 * m), 0, screen)
+            walls.fill(self.LAYER_KEY)
+            walls.set_colorkey(self.LAYER_KEY)
+            self._draw_walls(walls, maze, cell_size, m - c0 * cell_size, m - r0 * cell_size, (r0, r1), (c0, c1))
+
+            tile = [walls, None]
+            self._tiles[key] = tile
+            if len(self._tiles) > self.TILE_CACHE_SIZE:
+                self._tiles.popitem(last=False)
+        else:
+            self._tiles.move_to_end(key)
+
+        if tile[1] is None:
+            overlay = pygame.Surface((w, h), 0, screen)
+            overlay.fill(self.LAYER_KEY)
+            overlay.set_colorkey(self.LAYER_KEY)
+            tile[1] = overlay
+
+            on_trail = self._drawn_trail_src.contains_index
+            on_hint = self._on_hint
+            solution_cells = self._solution_cells
+            if len(self._drawn_trail) or solution_cells or len(self._drawn_hint):
+                size = maze.size
+                for r in range(r0, r1):
+                    for i in range(r * size + c0, r * size + c1):
+                        if on_trail(i) or i in solution_cells or on_hint(i):
+                            self._draw_overlay_cell(overlay, maze, i, cell_size, r0, c0)
+        return tile
+
+    def _prefetch_tile(self, screen, maze):
+        """
+        Build one missing tile in the ring around the view, if there is one.
+        """
+        cell_size, offset_x, offset_y = self._layout(maze)
+        if not self.cache_layers or not self._scrolls(maze, cell_size) or self._tiles_maze is not maze:
+            return
+
+        n = self._tile_cells(cell_size)
+        last = (maze.size - 1) // n
+        r0, r1, c0, c1 = self._visible_cells(self._grid_rect(), maze, cell_size, offset_x, offset_y)
+        for tr in range(max(0, r0 // n - 1), min(last, (r1 - 1) // n + 1) + 1):
+            for tc in range(max(0, c0 // n - 1), min(last, (c1 - 1) // n + 1) + 1):
+                if (tr, tc) not in self._tiles:
+                    self._get_tile(screen, maze, cell_size, tr, tc)
+                    return
+
+    def _sync_tiles(self, maze, cell_size, player, solution_path, hint=None):
+        """
+        Tile mode's version of _get_overlay_layer(): bring the cached tiles
+        up to date with the maze, trail, solution and hint.
+        """
+        if self._tiles_maze is not maze or self._tiles_cell != cell_size:
+            self._tiles.clear()
+            self._tiles_maze = maze
+            self._tiles_cell = cell_size
+
+        key = ("tiles", cell_size, self.window_w, self.window_h)
+        trail = player.trail
+        if self._overlay_stale(maze, key, solution_path, trail, hint):
+            # Walls are still good, only the overlays need redrawing
+            self._reset_overlay(maze, key, solution_path, trail, hint)
+            for tile in self._tiles.values():
+                tile[1] = None
+            return
+
+        n = self._tile_cells(cell_size)
+        for i in self._sync_trail(trail) + self._sync_hint(hint):
+            r, c = divmod(i, maze.size)
+            tr, tc = r // n, c // n
+            tile = self._tiles.get((tr, tc))
+            if tile is not None and tile[1] is not None:
+                self._draw_overlay_cell(tile[1], maze, i, cell_size, tr * n, tc * n)
+
+    def _get_wall_layer(self, screen, maze, cell_size):
+        """
+        The cached wall surface for this maze and cell size, rebuilt if
+        either one (or the window) changed since it was drawn.
+        """
+        key = (cell_size, self.window_w, self.window_h)
+        if self._wall_layer is not None and self._wall_layer_maze is maze and self._wall_layer_key == key:
+            return self._wall_layer
+
+        m = self.WALL_MARGIN
+        side = cell_size * maze.size + 2 * m
+        layer = pygame.Surface((side, side), 0, screen)
+        layer.fill(self.LAYER_KEY)
+        layer.set_colorkey(self.LAYER_KEY)
+        self._draw_walls(layer, maze, cell_size, m, m)
+
+        self._wall_layer = layer
+        self._wall_layer_maze = maze
+        self._wall_layer_key = key
+        return layer
+
+    def _get_overlay_layer(self, screen, maze, cell_size, player, solution_path, hint=None):
+        """
+        The trail + solution + hint surface, brought up to date with
+        player.trail and the hint route. Rebuilt from scratch only for a new
+        maze, cell size, solution, hint or trail list (Player.reset),
+        otherwise just the cells that were pushed or popped since last frame
+        are redrawn.
+        """
+        key = ("layer", cell_size, self.window_w, self.window_h)
+        trail = player.trail
+
+        if self._overlay_layer is None or self._overlay_stale(maze, key, solution_path, trail, hint):
+            side = cell_size * maze.size
+            layer = pygame.Surface((side, side), 0, screen)
+            layer.fill(self.LAYER_KEY)
+            layer.set_colorkey(self.LAYER_KEY)
+
+            self._overlay_layer = layer
+            self._reset_overlay(maze, key, solution_path, trail, hint)
+
+            for i in self._drawn_trail:
+                self._draw_overlay_cell(layer, maze, i, cell_size)
+            for i in self._solution_cells:
+                self._draw_overlay_cell(layer, maze, i, cell_size)
+            for i in self._drawn_hint:
+                self._draw_overlay_cell(layer, maze, i, cell_size)
+            return layer
+
+        for i in self._sync_trail(trail) + self._sync_hint(hint):
+            self._draw_overlay_cell(self._overlay_layer, maze, i, cell_size)
+        return self._overlay_layer
+
+    def _overlay_stale(self, maze, key, solution_path, trail, hint=None):
+        """
+        True if the trail/solution/hint state has to be rebuilt rather than
+        updated (new maze, cell size, solution, hint or trail list).
+        """
+        same_solution = solution_path is self._overlay_solution or (not solution_path and not self._overlay_solution)
+        return (
+            self._overlay_maze is not maze
+            or self._overlay_key != key
+            or not same_solution
+            or self._drawn_trail_src is not trail
+            or self._drawn_hint_src is not hint
+        )
+
+    def _reset_overlay(self, maze, key, solution_path, trail, hint=None):
+        self._overlay_maze = maze
+        self._overlay_key = key
+        self._overlay_solution = solution_path
+        self._solution_cells = {c.row * maze.size + c.col for c in solution_path}
+        self._drawn_trail = array("i", trail.indices)
+        self._drawn_trail_src = trail
+        self._drawn_hint = array("i", hint.indices) if hint is not None else array("i")
+        self._drawn_hint_src = hint
+
+    def _sync_trail(self, trail):
+        """
+        Update the drawn trail to match trail, returns the indices of the
+        cells that changed.
+        """
+        return self._sync_stack(self._drawn_trail, trail.indices)
+
+    def _sync_hint(self, hint):
+        """
+        _sync_trail() for the hint route.
+        """
+        if hint is None:
+            return []
+        return self._sync_stack(self._drawn_hint, hint.indices)
+
+    def _on_hint(self, i):
+        hint = self._drawn_hint_src
+        return hint is not None and hint.contains_index(i)
+
+    def _sync_stack(self, drawn, indices):
+        # Trail and hint are both stacks, pop what's no longer there, then
+        # push the rest
+        changed = []
+        while drawn and (len(drawn) > len(indices) or drawn[-1] != indices[len(drawn) - 1]):
+            changed.append(drawn.pop())
+        pushed = indices[len(drawn):]
+        drawn.extend(pushed)
+        changed.extend(pushed)
+        return changed
+
+    def _draw_overlay_cell(self, layer, maze, i, cell_size, r0=0, c0=0):
+        """
+        Redraw cell index i of an overlay surface from scratch. r0, c0 is
+        the cell at the surface's top left corner.
+        """
+        r, c = divmod(i, maze.size)
+        x = (c - c0) * cell_size
+        y = (r - r0) * cell_size
+
+        # Called after _sync_trail()/_sync_hint(), so they and the drawing agree
+        if self._drawn_trail_src.contains_index(i):
+            layer.fill(self.TRAIL_COLOR, (x, y, cell_size, cell_size))
+        else:
+            layer.fill(self.LAYER_KEY, (x, y, cell_size, cell_size))
+
+        if i in self._solution_cells:
+            pygame.draw.rect(layer, self.SOLUTION_COLOR, (x + 2, y + 2, cell_size - 4, cell_size - 4), 2)
+
+        if self._on_hint(i):
+            self._draw_hint_dot(layer, x, y, cell_size)
+
+    def _draw_hint_dot(self, surface, x, y, cell_size):
+        radius = max(1, cell_size // 6)
+        pygame.draw.circle(surface, self.HINT_COLOR, (x + cell_size // 2, y + cell_size // 2), radius)
+
+    def _draw_walls(self, surface, maze, cell_size, offset_x, offset_y, rows=None, cols=None):
+        """
+        Draw the walls of every cell, or only those in the rows and cols
+        (start, stop) ranges.
+        """
+        wall_color = (230, 230, 230)
+        walls = maze.walls
+        r0, r1 = rows if rows is not None else (0, maze.size)
+        c0, c1 = cols if cols is not None else (0, maze.size)
+        for r in range(r0, r1):
+            row_base = r * maze.size
+            for c in range(c0, c1):
+                w = walls[row_base + c]
+                x = offset_x + c * cell_size
+                y = offset_y + r * cell_size
+
+                if w & WALL_N:
+                    pygame.draw.line(surface, wall_color, (x, y), (x + cell_size, y), 2)
+                if w & WALL_E:
+                    pygame.draw.line(surface, wall_color, (x + cell_size, y), (x + cell_size, y + cell_size), 2)
+                if w & WALL_S:
+                    pygame.draw.line(surface, wall_color, (x, y + cell_size), (x + cell_size, y + cell_size), 2)
+                if w & WALL_W:
+                    pygame.draw.line(surface, wall_color, (x, y), (x, y + cell_size), 2)
+
+    def _text(self, font, text, color):
+        """
+        font.render(text, True, color), cached. Text only changes on input,
+        so the same few surfaces get drawn frame after frame. Not cached with
+        cache_layers off.
+        """
+        if not self.cache_layers:
+            return font.render(text, True, color)
+
+        key = (font, text, color)
+        surf = self._text_cache.get(key)
+        if surf is not None:
+            self._text_cache.move_to_end(key)
+            return surf
+
+        surf = font.render(text, True, color)
+        self._text_cache[key] = surf
+        if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return surf
+
+    def _get_ui_bar(self, screen, ui):
+        """
+        The cached UI bar, redrawn when the size text, focus or status
+        changed since it was drawn.
+        """
+        key = (ui.size_text, ui.active_input, ui.status_message, ui.is_error, self.window_w, self.ui_bar_h)
+        if self._ui_bar is not None and self._ui_bar_key == key:
+            return self._ui_bar
+
+        bar = pygame.Surface((self.window_w, self.ui_bar_h), 0, screen)
+        bar.fill((30, 30, 30))
+        self._ui_cursor_x = self._draw_ui(bar, ui)
+
+        self._ui_bar = bar
+        self._ui_bar_key = key
+        return bar
 
     def _draw_ui(self, screen, ui):
+        """
+        Everything in the UI bar but its background and the cursor. Returns
+        the cursor's x position.
+        """
         # Input box border changes when active
         input_border = (255, 255, 255) if ui.active_input else (180, 180, 180)
 
@@ -101,41 +862,34 @@ class Renderer:
         pygame.draw.rect(screen, input_border, ui.input_rect, 2, border_radius=6)
 
         # Put the label inside the visible UI area
-        label = self.font.render("Size:", True, (220, 220, 220))
+        label = self._text(self.font, "Size:", (220, 220, 220))
         screen.blit(label, (ui.input_rect.x, ui.input_rect.y - 16))
 
         # Draw input text
         txt = ui.size_text if ui.size_text != "" else ""
-        t_surf = self.font.render(txt, True, (240, 240, 240))
+        t_surf = self._text(self.font, txt, (240, 240, 240))
         text_x = ui.input_rect.x + 10
         text_y = ui.input_rect.y + 8
         screen.blit(t_surf, (text_x, text_y))
 
-        # Blinking cursor when active
-        if ui.active_input:
-            ticks = pygame.time.get_ticks()
-            if (ticks // 500) % 2 == 0:
-                cursor_x = text_x + t_surf.get_width() + 2
-                cursor_y0 = ui.input_rect.y + 8
-                cursor_y1 = ui.input_rect.y + ui.input_rect.h - 8
-                pygame.draw.line(screen, (240, 240, 240), (cursor_x, cursor_y0), (cursor_x, cursor_y1), 2)
-
         # Generate button
         pygame.draw.rect(screen, (70, 70, 70), ui.button_rect, border_radius=6)
         pygame.draw.rect(screen, (220, 220, 220), ui.button_rect, 2, border_radius=6)
-        b_surf = self.font.render("Generate", True, (240, 240, 240))
+        b_surf = self._text(self.font, "Generate", (240, 240, 240))
         screen.blit(b_surf, (ui.button_rect.x + 18, ui.button_rect.y + 8))
 
         # Status message
         color = (255, 120, 120) if ui.is_error else (220, 220, 220)
-        msg = self.font.render(ui.status_message, True, color)
+        msg = self._text(self.font, ui.status_message, color)
         screen.blit(msg, (310, 26))
 
+        return text_x + t_surf.get_width() + 2
+
     def _draw_win(self, screen):
         overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 120))
         screen.blit(overlay, (0, 0))
 
-        text = self.big_font.render("YOU WIN", True, (255, 255, 255))
+        text = self._text(self.big_font, "YOU WIN", (255, 255, 255))
         rect = text.get_rect(center=(self.window_w // 2, self.window_h // 2))
         screen.blit(text, rect)
@@ -0,0 +1,384 @@
+# replay.py
+"""
+Where main's frame loop gets its input from, plus timing stats.
+
+- LiveSource: the real event queue (the normal game)
+- Recorder: the real event queue, saved to a JSON file on the way out
+- Replayer: plays a recorded file back, as fast as possible or in real time
+- AutoPlayer: generates mazes and walks their solutions with arrow keys
+
+Every source times the frames and how long each arrow key press takes to
+show up on screen (from when the loop gets the event to the end of the
+frame that drew the move), see report().
+
+Recorded sessions store every key press, click and wheel turn with its
+frame number and time. Generation runs in the background, so the recording
+also marks each frame a new maze was swapped in, with the seed that maze
+was generated from (the recording's seed plus how many mazes were asked
+for before it, so every Generate still gives a new maze). Playback
+generates from the same seeds and waits at those marks until its own maze
+is ready, so input always lands on the same maze it did when it was
+recorded.
+"""
+import json
+import random
+import time
+
+import pygame
+
+from profiler import percentile
+from ui import MAX_SIZE
+
+
+FORMAT_VERSION = 1
+
+# Arrow keys by direction, and the directions they move in
+_ARROW_KEYS = {"N": pygame.K_UP, "E": pygame.K_RIGHT, "S": pygame.K_DOWN, "W": pygame.K_LEFT}
+_MOVE_KEYS = set(_ARROW_KEYS.values())
+_DIRECTIONS = {(-1, 0): "N", (0, 1): "E", (1, 0): "S", (0, -1): "W"}
+
+
+class LiveSource:
+    """
+    The real pygame event queue. Base class for the other sources.
+
+    main calls get() once per frame for that frame's events, next_seed()
+    for the seed of each maze it generates, can_swap() before swapping in a
+    finished maze, maze_ready() whenever a new maze is swapped in (and for
+    the first one), and frame_done() once the frame is on screen.
+    """
+    # Frame rate cap for the loop, None for main's FPS, 0 for no cap
+    fps = None
+
+    # Why the source stopped the loop early, if it did
+    error = None
+
+    def __init__(self):
+        self.frame = 0
+        self.move_latencies = []
+        self._pending_moves = []
+        self._t0 = None
+        self._t_end = None
+
+    def get(self, generating=False):
+        """
+        This frame's events. generating says whether a maze is on its way
+        (being generated, or finished and waiting for can_swap()).
+        """
+        return self._track(pygame.event.get())
+
+    def _track(self, events, at=None):
+        """
+        Note when arrow key presses entered the loop, returns events.
+        """
+        now = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = now
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key in _MOVE_KEYS:
+                self._pending_moves.append(now if at is None else at)
+        return events
+
+    def next_seed(self):
+        """
+        Seed for the next maze, None to use the generator's own.
+        """
+        return None
+
+    def can_swap(self):
+        """
+        False to keep a finished maze back for now, main asks again next
+        frame.
+        """
+        return True
+
+    def maze_ready(self, maze, player, solution_path):
+        pass
+
+    def frame_done(self):
+        now = time.perf_counter()
+        for t in self._pending_moves:
+            self.move_latencies.append(now - t)
+        self._pending_moves = []
+        self.frame += 1
+        self._t_end = now
+
+    def finish(self):
+        """
+        Called once when the loop exits.
+        """
+
+    def report(self):
+        """
+        One line of timing stats: frames per second and per-move latency.
+        """
+        elapsed = (self._t_end - self._t0) if self._t0 is not None and self._t_end is not None else 0.0
+        fps = self.frame / elapsed if elapsed > 0 else 0.0
+        lat = sorted(ms * 1000 for ms in self.move_latencies)
+        return (
+            f"{self.frame} frames in {elapsed:.2f}s ({fps:.1f} fps), {len(lat)} moves, "
+            f"latency ms p50 {percentile(lat, 50):.2f} p95 {percentile(lat, 95):.2f} "
+            f"p99 {percentile(lat, 99):.2f} max {lat[-1] if lat else 0.0:.2f}"
+        )
+
+
+class Recorder(LiveSource):
+    """
+    Plays live and writes the session to path when the loop exits.
+    """
+    def __init__(self, path, seed, window_size):
+        super().__init__()
+        self.path = path
+        self.seed = seed
+        self.window_size = window_size
+        self.entries = []
+        self._t_start = time.perf_counter()
+        self._seeds_used = 0
+        self._last_seed = None
+
+    def get(self, generating=False):
+        events = super().get(generating)
+        t = int((time.perf_counter() - self._t_start) * 1000)
+        for event in events:
+            entry = _encode(event)
+            if entry is not None:
+                entry["frame"] = self.frame
+                entry["t"] = t
+                self.entries.append(entry)
+        return events
+
+    def next_seed(self):
+        self._last_seed = self.seed + self._seeds_used
+        self._seeds_used += 1
+        return self._last_seed
+
+    def maze_ready(self, maze, player, solution_path):
+        # Only one maze is generated at a time, so this is the latest seed
+        t = int((time.perf_counter() - self._t_start) * 1000)
+        self.entries.append({"type": "ready", "size": maze.size, "seed": self._last_seed, "frame": self.frame, "t": t})
+
+    def finish(self):
+        save(self.path, self.seed, self.window_size, self.entries)
+
+
+def _encode(event):
+    if event.type == pygame.KEYDOWN:
+        return {"type": "key", "key": event.key, "unicode": event.unicode}
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return {"type": "click", "button": event.button, "pos": list(event.pos)}
+    if event.type == pygame.MOUSEWHEEL:
+        return {"type": "wheel", "x": event.x, "y": event.y}
+    if event.type == pygame.QUIT:
+        return {"type": "quit"}
+    return None
+
+
+def _decode(entry):
+    kind = entry["type"]
+    if kind == "key":
+        return pygame.event.Event(pygame.KEYDOWN, key=entry["key"], unicode=entry["unicode"], mod=0)
+    if kind == "click":
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=entry["button"], pos=tuple(entry["pos"]))
+    if kind == "wheel":
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=entry["x"], y=entry["y"])
+    if kind == "quit":
+        return pygame.event.Event(pygame.QUIT)
+    raise ValueError(f"Unknown recorded event type {kind!r}")
+
+
+def save(path, seed, window_size, entries):
+    with open(path, "w") as f:
+        json.dump({
+            "version": FORMAT_VERSION,
+            "seed": seed,
+            "window": list(window_size),
+            "events": entries,
+        }, f)
+
+
+def load(path):
+    """
+    Returns the recording as a dict (seed, window, events).
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported recording version {data.get('version')!r}")
+    return data
+
+
+class Replayer(LiveSource):
+    """
+    Feeds a recording back into the loop. realtime=False hands each event
+    over on its recorded frame with no frame cap, realtime=True at its
+    recorded time with the normal cap. Ends with a QUIT either way.
+
+    A maze that's ready sooner than it was in the recording is held back
+    (can_swap()) until the events recorded before it have been played, one
+    that's later is waited for. If playback is waiting for a maze and none
+    is on its way, it has drifted from the recording: it stops with a QUIT
+    and sets error instead of waiting forever.
+    """
+    def __init__(self, path, realtime=False):
+        super().__init__()
+        data = load(path)
+        self.seed = data["seed"]
+        self.window_size = tuple(data["window"])
+        self.realtime = realtime
+        self.fps = None if realtime else 0
+
+        self._entries = data["events"]
+        self._next = 0
+        # Recorded frame/time + shift = when it's due here. Moved forward
+        # every time playback has to wait longer for a maze than the
+        # recording did.
+        self._frame_shift = 0
+        self._time_shift = 0.0
+        self._start = None
+
+    def _due(self, entry, now):
+        if self.realtime:
+            return self._start + entry["t"] / 1000 + self._time_shift <= now
+        return entry["frame"] + self._frame_shift <= self.frame
+
+    def get(self, generating=False):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+
+        # Keep the OS happy, but only a window close gets through
+        events = [e for e in pygame.event.get() if e.type == pygame.QUIT]
+
+        if self._next < len(self._entries) and self._entries[self._next]["type"] == "ready" and not generating:
+            entry = self._entries[self._next]
+            self.error = (
+                f"Replay drifted from the recording: it waits for the maze recorded at "
+                f"frame {entry['frame']}, but no maze is being generated."
+            )
+            events.append(pygame.event.Event(pygame.QUIT))
+            return events
+
+        while self._next < len(self._entries):
+            entry = self._entries[self._next]
+            if entry["type"] == "ready" or not self._due(entry, now):
+                # Wait for the maze (maze_ready) or the event's turn
+                break
+            self._next += 1
+            event = _decode(entry)
+            at = self._start + entry["t"] / 1000 + self._time_shift if self.realtime else None
+            events.append(self._track([event], at)[0])
+
+        if self._next >= len(self._entries) and not events:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return events
+
+    def next_seed(self):
+        # The seed of the next maze the recording swapped in. Recordings
+        # made before seeds were saved used the one seed for every maze.
+        for k in range(self._next, len(self._entries)):
+            entry = self._entries[k]
+            if entry["type"] == "ready":
+                return entry.get("seed", self.seed)
+        return self.seed
+
+    def can_swap(self):
+        # Only once everything recorded before the maze showed up is played
+        if self._next >= len(self._entries):
+            return True
+        entry = self._entries[self._next]
+        return entry["type"] == "ready" and self._due(entry, time.perf_counter())
+
+    def maze_ready(self, maze, player, solution_path):
+        if self._start is None:
+            # The first maze is ready before the first get()
+            self._start = time.perf_counter()
+        if self._next >= len(self._entries):
+            return
+        entry = self._entries[self._next]
+        if entry["type"] != "ready":
+            return
+        self._next += 1
+
+        # Line the rest of the recording up with when the maze showed up
+        if self.realtime:
+            self._time_shift = time.perf_counter() - (self._start + entry["t"] / 1000)
+        else:
+            self._frame_shift = self.frame - entry["frame"]
+
+
+class AutoPlayer(LiveSource):
+    """
+    Types size into the size box, clicks Generate and walks the solution
+    one arrow key per frame, runs times over. Ends with a QUIT.
+    """
+    def __init__(self, ui, size, runs=1, realtime=False):
+        super().__init__()
+        self.ui = ui
+        self.size = size
+        self.runs = runs
+        self.fps = None if realtime else 0
+
+        self._script = []
+        self._path = None
+        self._step = 0
+        self._done_runs = 0
+        self._queue_generate()
+
+    def _queue_generate(self):
+        ui = self.ui
+        script = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=ui.input_rect.center)]
+        # Backspace out whatever's there, then type the size
+        for _ in range(len(str(MAX_SIZE))):
+            script.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode="\b", mod=0))
+        for ch in str(self.size):
+            script.append(pygame.event.Event(pygame.KEYDOWN, key=ord(ch), unicode=ch, mod=0))
+        script.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=ui.button_rect.center))
+        self._script = script
+        self._path = None
+
+    def get(self, generating=False):
+        events = [e for e in pygame.event.get() if e.type == pygame.QUIT]
+
+        if self._script:
+            # The UI needs one frame per click, so the scripted clicks and
+            # the keys after them go one per frame
+            events.append(self._script.pop(0))
+        elif self._path is not None:
+            if self._step + 1 < len(self._path):
+                here = self._path[self._step]
+                there = self._path[self._step + 1]
+                direction = _DIRECTIONS[(there.row - here.row, there.col - here.col)]
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=_ARROW_KEYS[direction], unicode="", mod=0))
+                self._step += 1
+            else:
+                self._done_runs += 1
+                if self._done_runs >= self.runs:
+                    events.append(pygame.event.Event(pygame.QUIT))
+                else:
+                    self._queue_generate()
+        return self._track(events)
+
+    def maze_ready(self, maze, player, solution_path):
+        # Only the mazes asked for count, not the one the game starts with
+        if self._script or maze.size != self.size or self._path is not None:
+            return
+        self._path = solution_path
+        self._step = 0
+
+
+def make_source(args, ui, window_size):
+    """
+    The source main's command line asks for, and the generator seed to use
+    (None for an unseeded generator).
+    """
+    if args.replay:
+        source = Replayer(args.replay, realtime=args.realtime)
+        return source, source.seed
+    if args.autoplay:
+        return AutoPlayer(ui, args.autoplay, runs=args.runs, realtime=args.realtime), args.seed
+    if args.record:
+        # A recording needs its mazes to come out the same on playback, so
+        # they're generated from seeds counted up from this one
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+        return Recorder(args.record, seed, window_size), seed
+    return LiveSource(), args.seed
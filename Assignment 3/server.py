@@ -0,0 +1,378 @@
+# server.py
+"""
+Headless maze server: many players at once over a local socket, no window.
+
+Each connection is one session with its own Player. Sessions that ask for
+the same (size, seed) share one maze from the MazeCache: its walls are
+stored as bytes so no session can change them, and the solution is worked
+out once when the maze is built. Building happens off the event loop, in a
+thread for small mazes and a separate process for big ones (like
+worker.GenerationWorker), and sessions asking for a maze that's still being
+built wait for that build instead of starting their own.
+
+Protocol: one command per line, one reply line per command, starting with
+OK or ERR. Commands can be sent ahead of their replies.
+
+    GENERATE size [seed]  start a new maze (random seed if none)
+                          -> OK size seed solution_length
+    MOVE N|E|S|W          -> OK moved row col won (moved and won are 0/1)
+    STATE                 -> OK size seed row col trail_length won moves
+                             (OK none before the first GENERATE)
+    SOLUTION              -> OK directions, start to finish, e.g. OK EESSE
+    QUIT                  -> OK bye, then the connection is closed
+
+Usage: python server.py --port 8765 (or --unix /tmp/maze.sock)
+See loadgen.py for a client that puts it under load.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Not on Windows, the open file limit is left as it is
+    resource = None
+
+from algorithms import DEFAULT_ALGORITHM, algorithm_names
+from generator import MazeGenerator
+from maze import DIRECTIONS, Maze
+from player import Player
+from solver import solve_path
+from worker import PROCESS_MIN_SIZE
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MIN_SIZE = 3
+DEFAULT_MAX_SIZE = 2000
+
+# Memory the cached mazes may use, least recently used dropped first
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Unsent reply bytes per session before the session waits for its client
+DRAIN_BYTES = 64 * 1024
+
+
+def raise_open_file_limit():
+    """
+    Every session is an open socket, so lift the soft limit to the hard one.
+    """
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def build_maze(size, seed, algorithm=DEFAULT_ALGORITHM):
+    """
+    Generate and solve one maze. Returns (walls, solution) as bytes (the
+    solution as an array("i") of flat cell indices), so it can run in
+    another process.
+    """
+    maze = MazeGenerator(random_seed=seed, algorithm=algorithm).generate(size)
+    path = solve_path(maze, maze.start_cell, maze.finish_cell)
+    return bytes(maze.walls), array("i", (maze.index_of(c) for c in path)).tobytes()
+
+
+class SharedMaze:
+    """
+    One built maze, shared by every session playing it. Read only.
+    """
+    __slots__ = ("size", "seed", "maze", "solution", "directions")
+
+    def __init__(self, size, seed, walls, solution):
+        self.size = size
+        self.seed = seed
+        self.maze = Maze(size, walls=bytes(walls))
+        self.solution = array("i")
+        self.solution.frombytes(solution)
+
+        steps = {-size: "N", 1: "E", size: "S", -1: "W"}
+        path = self.solution
+        self.directions = "".join(steps[path[k + 1] - path[k]] for k in range(len(path) - 1))
+
+    @property
+    def nbytes(self):
+        return len(self.maze.walls) + self.solution.itemsize * len(self.solution) + len(self.directions)
+
+
+class MazeCache:
+    """
+    SharedMazes by (size, seed), built on demand and kept in least recently
+    used order up to max_bytes. Dropping a maze from the cache doesn't
+    affect sessions still playing it.
+    """
+    def __init__(self, algorithm=DEFAULT_ALGORITHM, max_bytes=DEFAULT_CACHE_BYTES, processes=None):
+        self.algorithm = algorithm
+        self.max_bytes = max_bytes
+        self._processes = processes
+        self._process_pool = None
+
+        self._mazes = OrderedDict()
+        self._bytes = 0
+        # (size, seed) -> Future of a build that's under way
+        self._building = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._mazes)
+
+    @property
+    def memory_used(self):
+        return self._bytes
+
+    async def get(self, size, seed):
+        key = (size, seed)
+        shared = self._mazes.get(key)
+        if shared is not None:
+            self._mazes.move_to_end(key)
+            self.hits += 1
+            return shared
+
+        build = self._building.get(key)
+        if build is None:
+            self.misses += 1
+            build = asyncio.ensure_future(self._build(size, seed))
+            self._building[key] = build
+        else:
+            # Someone else asked first, wait for theirs
+            self.hits += 1
+        # A session that disconnects while waiting mustn't cancel the build
+        return await asyncio.shield(build)
+
+    async def _build(self, size, seed):
+        key = (size, seed)
+        loop = asyncio.get_running_loop()
+        executor = None
+        if size >= PROCESS_MIN_SIZE:
+            if self._process_pool is None:
+                # Spawned, not forked: a forked worker would inherit every open
+                # client socket and keep it open after the session closes it
+                self._process_pool = ProcessPoolExecutor(
+                    self._processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            executor = self._process_pool
+        try:
+            walls, solution = await loop.run_in_executor(executor, build_maze, size, seed, self.algorithm)
+        finally:
+            del self._building[key]
+
+        shared = SharedMaze(size, seed, walls, solution)
+        self._mazes[key] = shared
+        self._bytes += shared.nbytes
+        while self._bytes > self.max_bytes and len(self._mazes) > 1:
+            _, old = self._mazes.popitem(last=False)
+            self._bytes -= old.nbytes
+        return shared
+
+    def close(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+
+class Session:
+    """
+    One connected player.
+    """
+    __slots__ = ("shared", "player", "moves", "won")
+
+    def __init__(self):
+        self.shared = None
+        self.player = Player()
+        self.moves = 0
+        self.won = False
+
+
+class MazeServer:
+    """
+    Runs the sessions. command() is the whole protocol, handle_client() the
+    connection loop around it.
+    """
+    def __init__(self, cache, max_size=DEFAULT_MAX_SIZE):
+        self.cache = cache
+        self.max_size = max_size
+
+        self.sessions = 0
+        self.total_sessions = 0
+        self.moves = 0
+
+    async def handle_client(self, reader, writer):
+        self.sessions += 1
+        self.total_sessions += 1
+        session = Session()
+        transport = writer.transport
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.command(session, line.decode("ascii", "replace"))
+                writer.write(reply.encode("ascii") + b"\n")
+                if reply == "OK bye":
+                    break
+                # Replies are one short line, only wait when a client stops reading
+                if transport.get_write_buffer_size() > DRAIN_BYTES:
+                    await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def command(self, session, line):
+        parts = line.split()
+        if not parts:
+            return "ERR empty command"
+        name = parts[0].upper()
+        args = parts[1:]
+
+        if name == "MOVE":
+            return self._move(session, args)
+        if name == "GENERATE":
+            return await self._generate(session, args)
+        if name == "STATE":
+            return self._state(session)
+        if name == "SOLUTION":
+            if session.shared is None:
+                return "ERR no maze yet, send GENERATE first"
+            return "OK " + session.shared.directions
+        if name == "QUIT":
+            return "OK bye"
+        return f"ERR unknown command {parts[0]!r} (GENERATE, MOVE, STATE, SOLUTION, QUIT)"
+
+    async def _generate(self, session, args):
+        if not 1 <= len(args) <= 2:
+            return "ERR usage: GENERATE size [seed]"
+        try:
+            size = int(args[0])
+            seed = int(args[1]) if len(args) == 2 else random.randrange(2 ** 31)
+        except ValueError:
+            return "ERR size and seed must be integers"
+        if size < MIN_SIZE or size > self.max_size:
+            return f"ERR size must be between {MIN_SIZE} and {self.max_size}"
+
+        try:
+            shared = await self.cache.get(size, seed)
+        except Exception as e:
+            return f"ERR maze generation failed: {e}"
+
+        session.shared = shared
+        session.player.reset(shared.maze.start_cell)
+        session.moves = 0
+        session.won = False
+        return f"OK {size} {seed} {len(shared.solution)}"
+
+    def _move(self, session, args):
+        if session.shared is None:
+            return "ERR no maze yet, send GENERATE first"
+        if len(args) != 1 or args[0].upper() not in DIRECTIONS:
+            return "ERR usage: MOVE N|E|S|W"
+        if session.won:
+            return "ERR already at the finish, send GENERATE for a new maze"
+
+        player = session.player
+        maze = session.shared.maze
+        moved = player.try_move(args[0].upper(), maze)
+        # Nobody draws the trail here
+        player.dirty_cells.clear()
+        if moved:
+            session.moves += 1
+            self.moves += 1
+            if player.current_cell == maze.finish_cell:
+                session.won = True
+        cell = player.current_cell
+        return f"OK {int(moved)} {cell.row} {cell.col} {int(session.won)}"
+
+    def _state(self, session):
+        shared = session.shared
+        if shared is None:
+            return "OK none"
+        cell = session.player.current_cell
+        return (
+            f"OK {shared.size} {shared.seed} {cell.row} {cell.col} "
+            f"{len(session.player.trail)} {int(session.won)} {session.moves}"
+        )
+
+    def stats(self):
+        cache = self.cache
+        return (
+            f"{self.sessions} sessions ({self.total_sessions} total), {self.moves} moves, "
+            f"cache {len(cache)} mazes {cache.memory_used / 1e6:.1f} MB, "
+            f"{cache.hits} hits {cache.misses} misses"
+        )
+
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, stats_every=0):
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle_client, path=unix_path, backlog=4096)
+        where = unix_path
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port, backlog=4096)
+        where = f"{host}:{port}"
+    print(f"Serving mazes on {where}", flush=True)
+
+    async with listener:
+        if stats_every > 0:
+            last_moves = server.moves
+            last_t = time.perf_counter()
+            while True:
+                await asyncio.sleep(stats_every)
+                now = time.perf_counter()
+                rate = (server.moves - last_moves) / (now - last_t)
+                last_moves, last_t = server.moves, now
+                print(f"{server.stats()}, {rate:.0f} moves/s", flush=True)
+        else:
+            await listener.serve_forever()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Headless multi-session maze server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--algorithm", default=DEFAULT_ALGORITHM, choices=algorithm_names())
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="biggest maze a session may ask for")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+                        help="memory for cached mazes")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="processes for building big mazes (default: one per CPU)")
+    parser.add_argument("--stats", type=float, default=0, metavar="SECONDS",
+                        help="print session and move counts this often")
+    args = parser.parse_args(argv)
+    if args.max_size < MIN_SIZE:
+        parser.error(f"--max-size must be at least {MIN_SIZE}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    raise_open_file_limit()
+
+    cache = MazeCache(algorithm=args.algorithm, max_bytes=args.cache_mb * 1024 * 1024, processes=args.processes)
+    server = MazeServer(cache, max_size=args.max_size)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix, args.stats))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# solver.py
+"""
+Maze solving on the flat wall array.
+
+The BFS goes one level (frontier) at a time. Big frontiers are expanded with
+NumPy array operations, small ones with a plain loop, since in long corridors
+NumPy's per-call overhead costs more than the loop does. Both work on the
+same parent buffer, so switching between them is free.
+
+NumPy is optional, without it every level uses the plain loop.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from maze import WALL_N, WALL_E, WALL_S, WALL_W
+
+
+# Frontiers at least this big are expanded with NumPy
+VECTOR_MIN_FRONTIER = 128
+
+NO_PARENT = -1
+
+
+def bfs_parents(maze, root, target=None):
+    """
+    Breadth-first search from the flat index root.
+
+    Returns an array of parent indices: parents[i] is the cell i was reached
+    from, parents[root] == root, and NO_PARENT for cells not reached. If target
+    is given, the search stops as soon as the target is reached.
+    """
+    size = maze.size
+    # Packed walls are decoded once up front
+    walls = maze.wall_bytes()
+
+    parents = array("i", [NO_PARENT]) * (size * size)
+    parents[root] = root
+
+    if np is not None:
+        wall_arr = np.frombuffer(walls, dtype=np.uint8)
+        parent_arr = np.frombuffer(parents, dtype=np.int32)
+        steps = ((WALL_N, -size), (WALL_E, 1), (WALL_S, size), (WALL_W, -1))
+
+    frontier = [root]
+    while len(frontier):
+        if target is not None and parents[target] != NO_PARENT:
+            break
+
+        if np is None or len(frontier) < VECTOR_MIN_FRONTIER:
+            if not isinstance(frontier, list):
+                frontier = frontier.tolist()
+
+            nxt = []
+            for i in frontier:
+                w = walls[i]
+                if not w & WALL_N and parents[i - size] == NO_PARENT:
+                    parents[i - size] = i
+                    nxt.append(i - size)
+                if not w & WALL_E and parents[i + 1] == NO_PARENT:
+                    parents[i + 1] = i
+                    nxt.append(i + 1)
+                if not w & WALL_S and parents[i + size] == NO_PARENT:
+                    parents[i + size] = i
+                    nxt.append(i + size)
+                if not w & WALL_W and parents[i - 1] == NO_PARENT:
+                    parents[i - 1] = i
+                    nxt.append(i - 1)
+            frontier = nxt
+        else:
+            if isinstance(frontier, list):
+                frontier = np.array(frontier, dtype=np.int32)
+
+            frontier_walls = wall_arr[frontier]
+            parts = []
+            for bit, offset in steps:
+                src = frontier[(frontier_walls & bit) == 0]
+                if not src.size:
+                    continue
+                dst = src + offset
+                fresh = parent_arr[dst] == NO_PARENT
+                dst = dst[fresh]
+                parent_arr[dst] = src[fresh]
+                parts.append(dst)
+
+            if parts:
+                frontier = np.concatenate(parts)
+            else:
+                frontier = []
+
+    return parents
+
+
+def path_to_root(parents, index):
+    """
+    Follow parent links from index back to the BFS root.
+    Returns flat indices from index to the root, or [] if index wasn't reached.
+    """
+    if parents[index] == NO_PARENT:
+        return []
+
+    out = [index]
+    while parents[index] != index:
+        index = parents[index]
+        out.append(index)
+    return out
+
+
+def solve_path(maze, start_cell, finish_cell):
+    """
+    Shortest path as a list of cells from start to finish ([] if there isn't one).
+    """
+    start = maze.index_of(start_cell)
+    finish = maze.index_of(finish_cell)
+
+    # Search from the finish so the parent chain reads start -> finish
+    parents = bfs_parents(maze, finish, target=start)
+    cell_at = maze.cell_at
+    return [cell_at(i) for i in path_to_root(parents, start)]
+
+
+class CellPath:
+    """
+    A path kept as flat cell indices (an array("i")) that reads like a list
+    of cells (len, iteration, indexing). Cells are only made when they're
+    looked at, so a long solution costs 4 bytes a step instead of a Cell
+    each, like player.Trail.
+    """
+    __slots__ = ("maze", "indices")
+
+    def __init__(self, maze, indices):
+        self.maze = maze
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        cell_at = self.maze.cell_at
+        for i in self.indices:
+            yield cell_at(i)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.maze.cell_at(j) for j in self.indices[i]]
+        return self.maze.cell_at(self.indices[i])
+
+
+def solve_with_parents(maze, start_cell, finish_cell):
+    """
+    solve_path, but the BFS from the finish covers the whole maze instead of
+    stopping at the start. Returns (path, parents): the path as a CellPath,
+    parents giving the way to the finish from every cell (see
+    hint.HintRoute).
+    """
+    start = maze.index_of(start_cell)
+    parents = bfs_parents(maze, maze.index_of(finish_cell))
+    return CellPath(maze, array("i", path_to_root(parents, start))), parents
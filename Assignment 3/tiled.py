@@ -0,0 +1,188 @@
+# tiled.py
+"""
+Tiled generation for very large mazes.
+
+The grid is cut into tile_size x tile_size blocks (the last row and column
+of blocks may be smaller). Each block is carved into a perfect maze of its
+own by a worker process, with any registered algorithm. The blocks are then
+joined by treating them as the cells of a small maze: a spanning tree over
+the block grid is carved with Kruskal's algorithm, and for every edge of
+that tree exactly one passage is opened at a random spot along the shared
+border. Every block is a tree and the blocks are joined along a tree, so the
+whole grid is still a perfect maze.
+
+With a seed the result is deterministic, whatever the process count.
+
+Usage: python tiled.py SIZE [--tile N] [--seed N] [--processes N] [--algorithm NAME]
+"""
+import argparse
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from algorithms import DEFAULT_ALGORITHM, algorithm_names, get_algorithm
+from generator import RNG_PYTHON, RNG_NUMPY, make_rng
+from maze import Maze, ALL_WALLS, WALL_E, WALL_S, NOT_N, NOT_E, NOT_S, NOT_W
+from solver import bfs_parents, NO_PARENT, solve_path
+
+
+DEFAULT_TILE_SIZE = 512
+
+# Blocks are joined along a Kruskal tree, which has no directional bias
+STITCH_ALGORITHM = "kruskal"
+
+
+def _block_spans(size, tile_size):
+    """
+    (start, length) of each block along one axis.
+    """
+    return [(start, min(tile_size, size - start)) for start in range(0, size, tile_size)]
+
+
+def _carve_block(spec):
+    """
+    Carve one block. Runs in a worker process, returns (block index, walls).
+    """
+    index, width, height, seed, algorithm, rng_backend = spec
+    walls = bytearray([ALL_WALLS]) * (width * height)
+    get_algorithm(algorithm)(walls, width, height, make_rng(seed, rng_backend))
+    return index, bytes(walls)
+
+
+def generate_tiled(size, tile_size=DEFAULT_TILE_SIZE, seed=None, algorithm=DEFAULT_ALGORITHM,
+                   rng_backend=RNG_PYTHON, processes=None, progress=None):
+    """
+    Build a size x size perfect maze out of independently carved blocks.
+
+    processes=None uses one process per CPU, processes=1 carves every block
+    in this process. progress(done, total) is called as blocks finish.
+    """
+    if tile_size < 2:
+        raise ValueError("tile_size must be at least 2")
+    get_algorithm(algorithm)
+
+    # Block seeds and the stitching all come from one master stream, so a
+    # seed fixes the whole maze no matter which process carves which block
+    master = random.Random(seed)
+
+    spans = _block_spans(size, tile_size)
+    blocks_across = len(spans)
+    specs = []
+    for br, (_, height) in enumerate(spans):
+        for bc, (_, width) in enumerate(spans):
+            block_seed = master.getrandbits(63)
+            specs.append((br * blocks_across + bc, width, height, block_seed, algorithm, rng_backend))
+
+    walls = bytearray(size * size)
+    total = size * size
+    done = 0
+
+    def place(index, block):
+        br, bc = divmod(index, blocks_across)
+        r0, height = spans[br]
+        c0, width = spans[bc]
+        for r in range(height):
+            start = (r0 + r) * size + c0
+            walls[start:start + width] = block[r * width:(r + 1) * width]
+        return width * height
+
+    if processes == 1 or len(specs) == 1:
+        for spec in specs:
+            done += place(*_carve_block(spec))
+            if progress is not None:
+                progress(done, total)
+    else:
+        with Pool(processes) as pool:
+            for index, block in pool.imap_unordered(_carve_block, specs):
+                done += place(index, block)
+                if progress is not None:
+                    progress(done, total)
+
+    _stitch(walls, size, spans, master)
+    return Maze(size, walls=walls)
+
+
+def _stitch(walls, size, spans, rng):
+    """
+    Open one passage along each edge of a spanning tree over the blocks.
+    """
+    n = len(spans)
+    tree = bytearray([ALL_WALLS]) * (n * n)
+    get_algorithm(STITCH_ALGORITHM)(tree, n, n, rng)
+
+    for br in range(n):
+        r0, height = spans[br]
+        for bc in range(n):
+            c0, width = spans[bc]
+            t = tree[br * n + bc]
+
+            if not t & WALL_E and bc < n - 1:
+                # Passage through the block's east border
+                r = r0 + rng.randrange(height)
+                i = r * size + c0 + width - 1
+                walls[i] &= NOT_E
+                walls[i + 1] &= NOT_W
+
+            if not t & WALL_S and br < n - 1:
+                # Passage through the block's south border
+                c = c0 + rng.randrange(width)
+                i = (r0 + height - 1) * size + c
+                walls[i] &= NOT_S
+                walls[i + size] &= NOT_N
+
+
+def is_perfect(maze):
+    """
+    True if every cell is reachable from cell 0 and there are exactly
+    cells - 1 passages, i.e. the maze is a spanning tree.
+    """
+    total = maze.size * maze.size
+    walls = maze.walls
+    # Each passage shows up on both of its cells, as a missing wall bit
+    missing = sum(4 - bin(w & ALL_WALLS).count("1") for w in walls)
+    if missing != 2 * (total - 1):
+        return False
+    parents = bfs_parents(maze, 0)
+    return parents.count(NO_PARENT) == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate one huge maze in tiles across processes.")
+    parser.add_argument("size", type=int)
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--algorithm", default=DEFAULT_ALGORITHM, choices=algorithm_names())
+    parser.add_argument("--rng-backend", default=RNG_PYTHON, choices=(RNG_PYTHON, RNG_NUMPY))
+    parser.add_argument("--out", default=None, help="save the maze and solution to this file")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    t0 = time.perf_counter()
+    maze = generate_tiled(
+        args.size, args.tile, seed=args.seed, algorithm=args.algorithm,
+        rng_backend=args.rng_backend, processes=args.processes,
+    )
+    t1 = time.perf_counter()
+
+    # Same solver build_solution_path in main.py uses
+    path = solve_path(maze, maze.start_cell, maze.finish_cell)
+    t2 = time.perf_counter()
+    if not path:
+        print("No path from start to finish!")
+        return 1
+    if not is_perfect(maze):
+        print("Maze is not perfect!")
+        return 1
+
+    print(f"{args.size}x{args.size} in {t1 - t0:.2f}s, solved in {t2 - t1:.2f}s, "
+          f"solution length {len(path)}")
+
+    if args.out:
+        import mazefile
+        mazefile.save(args.out, maze, path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
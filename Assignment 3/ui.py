@@ -2,6 +2,14 @@
 import pygame
 
 
+# Maze sizes the size box accepts. Big mazes are drawn through the renderer's
+# scrolling camera, so the top end is only limited by generation time.
+MIN_SIZE = 3
+MAX_SIZE = 10000
+
+SIZE_ERROR = f"Please enter an integer in the range of {MIN_SIZE} to {MAX_SIZE}."
+
+
 class UIControls:
     """
     Very simple UI:
@@ -24,6 +32,9 @@ class UIControls:
         # Button flags
         self._generate_clicked = False
 
+        # Set whenever something visible in the UI bar changes
+        self._dirty = True
+
         # UI layout
         self.input_rect = pygame.Rect(20, 18, 120, 34)
         self.button_rect = pygame.Rect(160, 18, 120, 34)
@@ -31,17 +42,22 @@ class UIControls:
     def set_status(self, text):
         self.status_message = text
         self.is_error = False
+        self._dirty = True
 
     def set_error(self, text):
         self.status_message = text
         self.is_error = True
+        self._dirty = True
 
     def handle_mouse_click(self, pos):
         # Clicking input box toggles typing focus w/ blinking cursor
+        was_active = self.active_input
         if self.input_rect.collidepoint(pos):
             self.active_input = True
         else:
             self.active_input = False
+        if self.active_input != was_active:
+            self._dirty = True
 
         # Clicking Generate requests generation
         if self.button_rect.collidepoint(pos):
@@ -56,13 +72,15 @@ class UIControls:
 
         if key == pygame.K_BACKSPACE:
             self.size_text = self.size_text[:-1]
+            self._dirty = True
             return
 
         # Only allow digits in the size box
         if unicode_char.isdigit():
-            # Keep it 3 characters or less
-            if len(self.size_text) < 3:
+            # Keep it as short as the biggest size
+            if len(self.size_text) < len(str(MAX_SIZE)):
                 self.size_text += unicode_char
+                self._dirty = True
 
     def consume_generate_clicked(self):
         """
@@ -73,20 +91,29 @@ class UIControls:
             return True
         return False
 
+    def consume_dirty(self):
+        """
+        One-shot flag, True if the UI bar needs redrawing.
+        """
+        if self._dirty:
+            self._dirty = False
+            return True
+        return False
+
     def get_requested_size(self):
         """
         Returns (size_int, err_string_or_None).
         """
         text = self.size_text.strip()
         if text == "":
-            return None, "Please enter an integer in the range of 3 to 100."
+            return None, SIZE_ERROR
 
         try:
             size = int(text)
         except ValueError:
-            return None, "Please enter an integer in the range of 3 to 100."
+            return None, SIZE_ERROR
 
-        if size < 3 or size > 100:
-            return None, "Please enter an integer in the range of 3 to 100."
+        if size < MIN_SIZE or size > MAX_SIZE:
+            return None, SIZE_ERROR
 
         return size, None
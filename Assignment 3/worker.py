@@ -0,0 +1,234 @@
+# worker.py
+"""
+Maze generation off the frame loop.
+
+GenerationWorker runs MazeGenerator.generate plus the BFS from the finish
+(solver.solve_with_parents) in a background thread, or in a separate process
+for big mazes so the frame loop keeps the CPU to itself. A process's messages
+are read and decoded on a receiving thread, so a big maze doesn't stall the
+frame it arrives in either. main polls it once per frame, reads the progress
+for the status line and swaps the new maze in when it's done.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from array import array
+
+from generator import GenerationCancelled, MazeGenerator
+from maze import Maze
+from solver import CellPath, solve_with_parents
+
+
+# Mazes at least this big are generated in a separate process
+PROCESS_MIN_SIZE = 500
+
+# How often the receiving thread checks whether its process died or the
+# job was cancelled, in seconds
+RECEIVE_POLL = 0.1
+
+STAGE_GENERATING = "Generating"
+STAGE_SOLVING = "Solving"
+
+
+class GenerationResult:
+    """
+    A finished job: the new maze, its start-to-finish solution and the BFS
+    parents that solution came from (the way to the finish from every cell,
+    for hint.HintRoute), plus how long each step took ({"generate": ms,
+    "solve": ms}, empty if not measured).
+    """
+    def __init__(self, size, maze=None, solution_path=None, error=None, timings=None, parents=None):
+        self.size = size
+        self.maze = maze
+        self.solution_path = solution_path or []
+        self.parents = parents
+        self.error = error
+        self.timings = timings or {}
+
+
+class _Job:
+    """
+    Shared state for one generation request. The worker side writes
+    stage/fraction/result, the frame loop only reads them.
+    """
+    def __init__(self, size, generator):
+        self.size = size
+        self.generator = generator
+        self.stage = STAGE_GENERATING
+        self.fraction = 0.0
+        self.result = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.process = None
+        self.messages = None
+        self.receiver = None
+
+
+def _process_main(size, seed, algorithm, rng_backend, messages):
+    """
+    Entry point for process mode. Sends ("progress", stage, fraction),
+    then ("done", walls, path indices, parents, timings) or ("error", text)
+    back to the parent.
+    """
+    def progress(done, total):
+        messages.put(("progress", STAGE_GENERATING, done / total))
+
+    try:
+        generator = MazeGenerator(random_seed=seed, algorithm=algorithm, rng_backend=rng_backend)
+        t0 = time.perf_counter()
+        maze = generator.generate(size, progress=progress)
+        t1 = time.perf_counter()
+        messages.put(("progress", STAGE_SOLVING, 1.0))
+        path, parents = solve_with_parents(maze, maze.start_cell, maze.finish_cell)
+        t2 = time.perf_counter()
+        timings = {"generate": (t1 - t0) * 1000, "solve": (t2 - t1) * 1000}
+        messages.put(("done", bytes(maze.walls), path.indices.tobytes(), parents.tobytes(), timings))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
+
+class GenerationWorker:
+    """
+    Generates one maze at a time in the background.
+
+    start(size) kicks off a job (start(size, seed) to generate it with that
+    seed instead of the generator's own), cancel() drops it, poll() returns
+    a GenerationResult once when the job finishes (None otherwise).
+    """
+    def __init__(self, generator, process_min_size=PROCESS_MIN_SIZE):
+        self.generator = generator
+        self.process_min_size = process_min_size
+        self._job = None
+
+    @property
+    def busy(self):
+        return self._job is not None
+
+    @property
+    def size(self):
+        return self._job.size if self._job is not None else None
+
+    def progress(self):
+        """
+        Returns (stage, fraction done) for the running job, or None.
+        """
+        job = self._job
+        if job is None:
+            return None
+        return job.stage, job.fraction
+
+    def start(self, size, seed=None):
+        if self._job is not None:
+            raise RuntimeError("A maze is already being generated")
+
+        job = _Job(size, self.generator.with_seed(seed))
+        if size >= self.process_min_size:
+            job.messages = multiprocessing.Queue()
+            job.process = multiprocessing.Process(
+                target=_process_main,
+                args=(
+                    size,
+                    job.generator.random_seed,
+                    job.generator.algorithm,
+                    job.generator.rng_backend,
+                    job.messages,
+                ),
+                daemon=True,
+            )
+            job.process.start()
+            job.receiver = threading.Thread(target=self._receive, args=(job,), daemon=True)
+            job.receiver.start()
+        else:
+            job.thread = threading.Thread(target=self._thread_main, args=(job,), daemon=True)
+            job.thread.start()
+        self._job = job
+
+    def cancel(self):
+        """
+        Stop the running job, if any. A thread stops at its next progress
+        check, a process is terminated right away.
+        """
+        job = self._job
+        if job is None:
+            return
+        job.cancel_event.set()
+        if job.process is not None:
+            job.process.terminate()
+            job.process.join()
+        self._job = None
+
+    def poll(self):
+        job = self._job
+        if job is None:
+            return None
+
+        if job.result is None:
+            return None
+
+        self._job = None
+        if job.process is not None:
+            job.process.join()
+        return job.result
+
+    def _thread_main(self, job):
+        def progress(done, total):
+            if job.cancel_event.is_set():
+                raise GenerationCancelled()
+            job.fraction = done / total
+
+        try:
+            t0 = time.perf_counter()
+            maze = job.generator.generate(job.size, progress=progress)
+            t1 = time.perf_counter()
+            job.stage = STAGE_SOLVING
+            path, parents = solve_with_parents(maze, maze.start_cell, maze.finish_cell)
+            t2 = time.perf_counter()
+        except GenerationCancelled:
+            return
+        except Exception as e:
+            job.result = GenerationResult(job.size, error=str(e))
+            return
+
+        if not job.cancel_event.is_set():
+            timings = {"generate": (t1 - t0) * 1000, "solve": (t2 - t1) * 1000}
+            job.result = GenerationResult(job.size, maze=maze, solution_path=path, timings=timings, parents=parents)
+
+    def _receive(self, job):
+        """
+        Process mode, on the receiving thread: read what the worker process
+        sends until it's done, failed or died, or the job is cancelled.
+        Unpickling and decoding a big maze happens here, off the frame loop.
+        """
+        while not job.cancel_event.is_set():
+            try:
+                msg = job.messages.get(timeout=RECEIVE_POLL)
+            except queue.Empty:
+                if job.process.is_alive():
+                    continue
+                # Died without reporting back (killed, out of memory...),
+                # unless its last message is still on the way
+                try:
+                    msg = job.messages.get(timeout=RECEIVE_POLL)
+                except queue.Empty:
+                    job.result = GenerationResult(job.size, error="Maze generation process exited unexpectedly.")
+                    return
+
+            kind = msg[0]
+            if kind == "progress":
+                job.stage = msg[1]
+                job.fraction = msg[2]
+            elif kind == "done":
+                size = job.size
+                maze = Maze(size, walls=bytearray(msg[1]))
+                indices = array("i")
+                indices.frombytes(msg[2])
+                parents = array("i")
+                parents.frombytes(msg[3])
+                job.result = GenerationResult(
+                    size, maze=maze, solution_path=CellPath(maze, indices), timings=msg[4], parents=parents
+                )
+                return
+            elif kind == "error":
+                job.result = GenerationResult(job.size, error=msg[1])
+                return